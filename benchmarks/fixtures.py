@@ -0,0 +1,138 @@
+import random
+import time
+
+
+# synthetic acm.timus.ru pages in the markup the timus_api parsers expect
+
+langs = ["Python 3.8 x64", "G++ 9.2 x64", "Visual C++ 2019", "Java 1.8", "PyPy 3.8 x64", "FreePascal 2.6"]
+verdicts = [
+    ("ac", "Accepted"),
+    ("rj", "Wrong answer"),
+    ("rj", "Time limit exceeded"),
+    ("rj", "Compilation error"),
+    ("wt", "Running"),
+]
+months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def submit_form():
+    options = "".join(f'<option value="{57 + i}">{name}</option>' for i, name in enumerate(langs))
+    return f'<html><body><form><select name="Language">{options}</select></form></body></html>'
+
+
+def supported_langs():
+    return {name: str(57 + i) for i, name in enumerate(langs)}
+
+
+def timestamp(submit_id):
+    # one submission every 30 seconds
+    return 1600000000 + submit_id * 30
+
+
+def status_row(submit_id, rng=None):
+    # rng=None makes the row a pure function of its submit id, so any page can be regenerated
+    rng = rng or random.Random(submit_id)
+    stat, reason = rng.choice(verdicts)
+    author_id = rng.randrange(1, 400000)
+    task_id = rng.randrange(1000, 2200)
+    date = time.gmtime(timestamp(submit_id) + 5 * 3600)  # the judge prints GMT+0500
+    test = f"{rng.randrange(1, 40)}" if stat == "rj" else "<BR>"
+    return (
+        f'<TR class="{"even" if submit_id % 2 else "odd"}">'
+        f'<TD class="id">{submit_id}</TD>'
+        f'<TD class="date"><NOBR>{time.strftime("%H:%M:%S", date)}</NOBR>'
+        f'<BR><NOBR>{date.tm_mday} {months[date.tm_mon - 1]} {date.tm_year}</NOBR></TD>'
+        f'<TD class="coder"><A HREF="author.aspx?id={author_id}">coder{author_id}</A></TD>'
+        f'<TD class="problem"><A HREF="problem.aspx?space=1&amp;num={task_id}">{task_id}'
+        f'<SPAN CLASS="problemname">. Problem {task_id}</SPAN></A></TD>'
+        f'<TD class="language">{rng.choice(langs)}</TD>'
+        f'<TD class="verdict_{stat}">{reason}</TD>'
+        f'<TD class="test">{test}</TD>'
+        f'<TD class="runtime">{rng.randrange(1, 2000) / 1000:.3f}</TD>'
+        f'<TD class="memory">{rng.randrange(100, 65536):,} KB'.replace(",", " ") + '</TD></TR>\n'
+    )
+
+
+def status_page(from_, count=1000, rng=None):
+    rows = "".join(status_row(sid, rng) for sid in range(from_, max(from_ - count, 0), -1))
+    return (
+        '<html><body><TABLE class="status"><TR class="header"><TH>ID</TH><TH>Date</TH></TR>\n'
+        f'{rows}</TABLE></body></html>'
+    )
+
+
+def author_page(author_id, rng=None):
+    rng = rng or random.Random(author_id)
+    solved = sorted(rng.sample(range(1000, 2200), rng.randrange(0, 300)))
+    cells = "".join(
+        f'<TD class="{"accepted" if n in solved else "empty"}">'
+        f'<A HREF="problem.aspx?space=1&amp;num={n}">{n}</A></TD>'
+        for n in range(1000, 2200)
+    )
+    return (
+        f'<html><body><H2 class="author_name">coder{author_id}</H2>'
+        f'<DIV class="author_motto">motto of coder{author_id}</DIV>'
+        f'<div class="flags-img flag-earth" title="Earth"></div>'
+        f'<TABLE class="author_stats">'
+        f'<TR><TD class="author_stats_name">Problems solved</TD>'
+        f'<TD class="author_stats_value">{len(solved)} out of 1200</TD></TR>'
+        f'<TR><TD class="author_stats_name">Rank by solved problems</TD>'
+        f'<TD class="author_stats_value">{rng.randrange(1, 150000)} out of 150000</TD></TR>'
+        f'<TR><TD class="author_stats_name">Rating</TD><TD class="author_stats_value">{rng.randrange(0, 9000)}</TD></TR>'
+        f'<TR><TD class="author_stats_name">Rank by rating</TD>'
+        f'<TD class="author_stats_value">{rng.randrange(1, 150000)}</TD></TR>'
+        f'</TABLE><TABLE class="attempt_list"><TR>{cells}</TR></TABLE></body></html>'
+    )
+
+
+def search_page(name, count=20):
+    rows = "".join(
+        f'<tr class="content"><td>{i + 1}</td><td><div class="flags-img flag-earth" title="Earth"></div></td>'
+        f'<td class="name"><a href="author.aspx?id={100000 + i}">{name}{i}</a></td><td>{5000 - i}</td>'
+        f'<td>{31 + i}</td><td>2 Nov 2022 22:16</td></tr>'
+        for i in range(count)
+    )
+    return f'<html><body><table class="ranklist">{rows}</table></body></html>'
+
+
+def problemset_page(volume, volumes=3):
+    rows = "".join(
+        f'<TR class="content"><TD></TD><TD>{n}</TD>'
+        f'<TD class="name"><A HREF="problem.aspx?space=1&amp;num={n}">'
+        f'Problem {n}{" &amp; Sum" if n % 7 == 0 else ""}</A></TD>'
+        f'<TD><A HREF="ranklist.aspx?space=1&amp;num={n}">{random.Random(n).randrange(1, 200000)}</A></TD>'
+        f'<TD>{random.Random(-n).randrange(1, 1000)}</TD></TR>\n'
+        for n in range(900 + volume * 100, 1000 + volume * 100)
+    )
+    pages = "".join(f'<A HREF="problemset.aspx?space=1&amp;page={v}">{v}</A> ' for v in range(1, volumes + 1))
+    return f'<html><body><DIV>{pages}</DIV><TABLE class="problemset">{rows}</TABLE></body></html>'
+
+
+def status_rows(from_, count):
+    # SubmitStatus rows straight from the generator, for benchmarks that don't measure parsing
+    from timus_api import SubmitStatus
+    langs_codes = supported_langs()
+    rows = []
+    for submit_id in range(from_, max(from_ - count, 0), -1):
+        rng = random.Random(submit_id)
+        stat, reason = rng.choice(verdicts)
+        lang = rng.choice(langs)
+        author_id = rng.randrange(1, 400000)
+        task_id = rng.randrange(1000, 2200)
+        rows.append(SubmitStatus(
+            submit_id=submit_id,
+            timestamp=float(timestamp(submit_id)),
+            accepted=None if stat == "wt" else stat == "ac",
+            reason=reason,
+            test=rng.randrange(1, 40) if stat == "rj" else 0,
+            runtime=rng.randrange(1, 2000) / 1000,
+            memory=rng.randrange(100, 65536),
+            author_id=str(author_id),
+            author_name=f"coder{author_id}",
+            task_id=str(task_id),
+            task_name=f"Problem {task_id}",
+            lang_name=lang,
+            lang_code=langs_codes[lang],
+            stat=stat,
+        ))
+    return rows
@@ -0,0 +1,81 @@
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+import timus_api
+from timus_api import SubmitStatus, detect_lang
+
+from . import fixtures
+
+
+def legacy_parse_status(data):
+    # status_naked parsing before the single-pass parser, kept as the baseline
+    rsp = []
+    p_entry = re.compile(r'(<TD class="id">(.*?)</TD>.*?<TD class="memory">[^>]*?>)', re.I)
+    p_author_id = re.compile(r'<TD class="coder">.*?id=(.*?)".*?</TD>', re.I)
+    p_author_name = re.compile(r'<TD class="coder">.*?>(.*?)</A></TD>', re.I)
+    p_task_id = re.compile(r'<TD class="problem">.*?num=(.*?)".*?</TD>', re.I)
+    p_task_name = re.compile(r'<TD class="problem">.*?>\. (.*?)<.*?</TD>', re.I)
+    p_lang = re.compile(r'<TD class="language">(.*?)</TD>', re.I)
+    p_verdict = re.compile(r'<TD class="verdict_(ac|rj|wt)">(.*?)</TD>', re.I)
+    p_runtime = re.compile(r'<TD class="runtime">(.*?)</TD>', re.I)
+    p_memory = re.compile(r'<TD class="memory">(.*?)</TD>', re.I)
+    p_test = re.compile(r'<TD class="test">(.*?)</TD>', re.I)
+    p_date = re.compile(r'<TD class="date"><NOBR>(.*?)</NOBR><BR><NOBR>(.*?)</NOBR></TD>', re.I)
+    for entry, submit_id in p_entry.findall(data):
+        stat = SubmitStatus()
+        stat.submit_id = int(submit_id)
+        verdict = p_verdict.findall(entry)[0]
+        stat.stat = verdict[0]
+        stat.accepted = None if verdict[0] == "wt" else False if verdict[0] == "rj" else True
+        stat.reason = verdict[1]
+        try:
+            stat.runtime = float(p_runtime.findall(entry)[0])
+        except (IndexError, ValueError):
+            stat.runtime = 0
+        try:
+            stat.memory = int(p_memory.findall(entry)[0].replace(" ", "")[:-2])
+        except (IndexError, ValueError):
+            stat.memory = 0
+        try:
+            stat.test = int(p_test.findall(entry)[0])
+        except (IndexError, ValueError):
+            stat.test = 0
+        stat.author_id = p_author_id.findall(entry)[0]
+        stat.author_name = p_author_name.findall(entry)[0]
+        stat.task_id = p_task_id.findall(entry)[0]
+        stat.task_name = p_task_name.findall(entry)[0]
+        stat.lang_name = p_lang.findall(entry)[0]
+        stat.lang_code = detect_lang(stat.lang_name.split()[0])
+        date = p_date.findall(entry)[0]
+        date = date[0] + " " + date[1] + " GMT+0500"
+        date = datetime.strptime(date, "%H:%M:%S %d %b %Y %Z%z")
+        stat.timestamp = date.timestamp()
+        rsp.append(stat)
+    return rsp
+
+
+def best_of(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(pages=5, repeat=5):
+    timus_api.supported_langs_cache = fixtures.supported_langs()
+    rng = random.Random(0)
+    data = [fixtures.status_page(10000000 - i * 1000, rng=rng) for i in range(pages)]
+    assert all(legacy_parse_status(page) == timus_api.parse_status(page) for page in data)
+    before = sum(best_of(legacy_parse_status, page, repeat) for page in data) / pages
+    after = sum(best_of(timus_api.parse_status, page, repeat) for page in data) / pages
+    print(f"1000-row page parse: before {before * 1000:.2f} ms, after {after * 1000:.2f} ms, "
+          f"x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,147 @@
+import hashlib
+import itertools
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from timus_api.client import Client
+
+from . import fixtures
+
+
+# recorded acm.timus.ru responses and a local stand-in server that replays them.
+# record against the real judge once:
+#     timus_api.client = RecordingClient("fixtures/")
+# then point the library at the recordings, or at synthetic pages for whatever wasn't recorded:
+#     with ReplayServer("fixtures/") as server:
+#         timus_api.client = Client(base_url=server.url, rate=None)
+
+
+def fixture_key(method, path, params=None):
+    # path and query string normalized the same way for recording and replay
+    path, _, query = path.lstrip("/").partition("?")
+    params = [*parse_qsl(query), *((params or {}).items())]
+    return f"{method} {path.lower()}?{urlencode(sorted((k, str(v)) for k, v in params))}"
+
+
+def fixture_file(root, key):
+    return os.path.join(root, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+
+class RecordingClient(Client):
+    # Client that also writes every response it gets to `root`, one json file per request
+
+    def __init__(self, root, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def request(self, method, path, retry_if=None, **kwargs):
+        r = super().request(method, path, retry_if=retry_if, **kwargs)
+        key = fixture_key(method, path, kwargs.get("params"))
+        headers = {k: v for k, v in r.headers.items() if k in ("Content-Type", "X-SubmitID", "ETag", "Last-Modified")}
+        with open(fixture_file(self.root, key), "wt", encoding="utf-8") as f:
+            json.dump({"key": key, "status": r.status_code, "headers": headers,
+                       "body": r.content.decode("utf-8", "replace")}, f, ensure_ascii=False)
+        return r
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.reply("GET", {})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.reply("POST", dict(parse_qsl(body.decode("utf-8", "replace"))))
+
+    def reply(self, method, form):
+        url = urlsplit(self.path)
+        status, headers, body = self.server.respond(method, url.path, dict(parse_qsl(url.query)), form)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", headers.pop("Content-Type", "text/html; charset=utf-8"))
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    # serves recorded fixtures from `root` on 127.0.0.1; requests that weren't recorded get synthetic pages:
+    # status.aspx below `newest` (from/count only, filters are ignored), author.aspx, search.aspx,
+    # problemset.aspx volumes, the submit.aspx form and accepted submissions with increasing ids.
+    # `requests` counts hits per page, for benchmarks that measure round trips
+
+    daemon_threads = True
+
+    def __init__(self, root=None, newest=1_000_000, port=0):
+        super().__init__(("127.0.0.1", port), ReplayHandler)
+        self.root = root
+        self.newest = newest
+        self.submit_ids = itertools.count(newest + 1)
+        self.requests: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def recorded(self, key):
+        if self.root is None:
+            return None
+        try:
+            with open(fixture_file(self.root, key), "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except OSError:
+            return None
+        return entry["status"], entry["headers"], entry["body"]
+
+    def respond(self, method, path, params, form):
+        page = path.strip("/").lower()
+        with self.lock:
+            self.requests[page] = self.requests.get(page, 0) + 1
+        rsp = self.recorded(fixture_key(method, page, params))
+        if rsp is not None:
+            return rsp
+        if page == "status.aspx":
+            start = min(int(params.get("from", self.newest)), self.newest)
+            return 200, {}, fixtures.status_page(start, int(params.get("count", 1000)))
+        if page == "author.aspx":
+            return 200, {}, fixtures.author_page(int(params.get("id", 1)))
+        if page == "problemset.aspx":
+            return 200, {}, fixtures.problemset_page(int(params.get("page", 1)))
+        if page == "search.aspx":
+            return 200, {}, fixtures.search_page(params.get("Str", ""))
+        if page == "submit.aspx" and method == "POST":
+            with self.lock:
+                self.newest = submit_id = next(self.submit_ids)  # shows up on the status table right away
+            return 302, {"X-SubmitID": str(submit_id), "Location": "status.aspx"}, ""
+        if page == "submit.aspx":
+            return 200, {}, fixtures.submit_form()
+        return 404, {}, ""
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="timus-replay", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
@@ -0,0 +1,126 @@
+import argparse
+import json
+import sys
+import time
+
+import timus_api
+from timus_api import StatusStore, StatusTable
+from timus_api.client import Client
+from timus_api.metrics import registry
+from timus_api.timeindex import TimeIndex
+
+from . import fixtures
+from .replay import ReplayServer
+
+
+# benchmark suite over the replay server, e.g.
+#     python -m benchmarks.run --sizes 1000,10000,100000 -o bench.json
+# every result is one json object {"bench", "size", "seconds", ...}; compare two runs by (bench, size)
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rsp = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rsp
+
+
+def bench_status_naked(server, repeat):
+    # one 1000-row page: round trip plus parsing, and parsing alone
+    fetch, rows = best_of(repeat, lambda: timus_api.status_naked(from_=server.newest))
+    data = fixtures.status_page(server.newest)
+    parse, _ = best_of(repeat, lambda: timus_api.parse_status(data))
+    return [
+        {"bench": "status_naked", "size": len(rows), "seconds": fetch},
+        {"bench": "parse_status", "size": len(rows), "seconds": parse},
+    ]
+
+
+def bench_status_iter(server, size, repeat):
+    results = []
+    for workers in (None, 8):
+        before = server.requests.get("status.aspx", 0)
+        seconds, rows = best_of(repeat, lambda: sum(1 for _ in timus_api.status_iter(
+            from_=server.newest, upto=server.newest - size, workers=workers
+        )))
+        results.append({
+            "bench": "status_iter", "size": rows, "workers": workers or 1, "seconds": seconds,
+            "requests": (server.requests.get("status.aspx", 0) - before) // repeat,
+        })
+    return results
+
+
+def bench_status_find(server, size, repeat):
+    # probes for a timestamp `size` submissions below the head, with an empty and a warm time index
+    target = fixtures.timestamp(server.newest - size) + 1
+    results = []
+    for state in ("cold", "warm"):
+        if state == "cold":
+            timus_api.time_index = TimeIndex()
+        start = time.perf_counter()
+        found = timus_api.status_find(target)
+        results.append({
+            "bench": "status_find", "size": size, "index": state, "seconds": time.perf_counter() - start,
+            "probes": found.probes, "found": list(found),
+        })
+    return results
+
+
+def bench_status_cached(size, repeat):
+    # the same selective query over a list, a StatusStore and a StatusTable of `size` rows
+    rows = fixtures.status_rows(size, size)
+    query = {"num": rows[0].task_id, "status": "accepted"}
+    results = []
+    containers = {"list": lambda: rows, "store": lambda: StatusStore(), "table": lambda: StatusTable(rows)}
+    for name, make in containers.items():
+        cache = make()
+        if name == "store":
+            cache.update(rows)
+        seconds, found = best_of(repeat, lambda: len(timus_api.status_cached(cache, **query)))
+        results.append({"bench": "status_cached", "size": size, "container": name, "seconds": seconds,
+                        "rows": found})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated row counts, up to 1000000")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--fixtures", help="directory of recorded responses to replay")
+    parser.add_argument("--only", help="comma-separated subset of naked,iter,find,cached")
+    parser.add_argument("-o", "--output", help="json output file, stdout by default")
+    args = parser.parse_args(argv)
+    sizes = [int(n) for n in args.sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else {"naked", "iter", "find", "cached"}
+    results = []
+    with ReplayServer(args.fixtures, newest=max(1_000_000, *sizes) + 1000) as server:
+        timus_api.client = Client(base_url=server.url, rate=None)
+        timus_api.page_cache = None  # measure the requests, not the cache
+        timus_api.time_index = TimeIndex()  # keep synthetic samples out of the user's cache
+        timus_api.supported_langs_cache = fixtures.supported_langs()
+        if "naked" in only:
+            results += bench_status_naked(server, args.repeat)
+        for size in sizes:
+            if "iter" in only:
+                results += bench_status_iter(server, size, args.repeat)
+            if "find" in only:
+                results += bench_status_find(server, size, args.repeat)
+            if "cached" in only:
+                results += bench_status_cached(size, args.repeat)
+            print(f"size {size} done", file=sys.stderr)
+    rsp = {"python": sys.version.split()[0], "sizes": sizes, "repeat": args.repeat, "results": results,
+           "metrics": registry.snapshot()}
+    if args.output:
+        with open(args.output, "wt", encoding="utf-8") as f:
+            json.dump(rsp, f, indent=1)
+    else:
+        json.dump(rsp, sys.stdout, indent=1)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# keep the library's user caches (langs, catalog, submits, time index) out of ~/.cache
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp(prefix="timus_api-tests-")
+
+import pytest
+
+import timus_api
+from timus_api.client import Client
+
+from .fixtures import pages, replay
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # no test reaches acm.timus.ru, the ones that need a judge use the server fixture
+    monkeypatch.setattr(timus_api, "client", Client(base_url="http://127.0.0.1:9", rate=None, retries=0))
+    monkeypatch.setattr(timus_api, "supported_langs_cache", pages.supported_langs())
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # ReplayServer with the library pointed at it and fresh in-memory caches
+    s = replay(monkeypatch)
+    yield s
+    s.stop()
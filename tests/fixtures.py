@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+from timus_api import PageCache, SubmitCache, TimeIndex
+from timus_api.client import Client
+from benchmarks import fixtures as pages
+from benchmarks.replay import ReplayServer
+
+
+# shared helpers of the test suite; conftest.py turns them into pytest fixtures
+
+# every status id up to this one has a final verdict in the synthetic pages, the next 9 too
+newest = 1000077
+
+
+def data_path(name):
+    return os.path.join(os.path.dirname(__file__), "data", name)
+
+
+def replay(monkeypatch, **kwargs):
+    # started ReplayServer with the library pointed at it and fresh in-memory caches
+    import timus_api
+    server = ReplayServer(newest=kwargs.pop("newest", newest), **kwargs)
+    # a short poll interval: stop() waits for it, and every test stops a server
+    server.thread = threading.Thread(target=server.serve_forever, args=(0.02,), name="timus-replay", daemon=True)
+    server.thread.start()
+    monkeypatch.setattr(timus_api, "client", Client(base_url=server.url, rate=None, retries=0))
+    monkeypatch.setattr(timus_api, "supported_langs_cache", pages.supported_langs())
+    monkeypatch.setattr(timus_api, "page_cache", PageCache())
+    monkeypatch.setattr(timus_api, "time_index", TimeIndex())
+    monkeypatch.setattr(timus_api, "submit_cache", SubmitCache())
+    return server
+
+
+def fail_pages(server, monkeypatch, match, page="status.aspx", status=500):
+    # makes the server answer `status` to every `page` request whose params satisfy match(params);
+    # returns a function that restores it
+    respond = server.respond
+
+    def failing(method, path, params, form):
+        if path.strip("/").lower() == page and match(params):
+            return status, {}, "Internal Server Error"
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", failing)
+    return lambda: monkeypatch.setattr(server, "respond", respond)
+
+
+def unwritable_cache(monkeypatch, tmp_path):
+    # points XDG_CACHE_HOME below a regular file, so nothing can be created in the user cache
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker / "cache"))
+    return str(blocker / "cache")
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.005)
+
+
+def record_submits(server, monkeypatch):
+    # list that receives the form of every submit.aspx POST the server gets
+    respond = server.respond
+    forms = []
+
+    def recording(method, path, params, form):
+        if method == "POST" and path.strip("/").lower() == "submit.aspx":
+            forms.append(form)
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", recording)
+    return forms
+
+
+def judged(server, monkeypatch):
+    # every synthetic submission gets its final verdict: "wt" rows of status pages become accepted ones
+    respond = server.respond
+
+    def final(method, path, params, form):
+        status, headers, body = respond(method, path, params, form)
+        if path.strip("/").lower() == "status.aspx":
+            body = body.replace('<TD class="verdict_wt">Running</TD>', '<TD class="verdict_ac">Accepted</TD>')
+        return status, headers, body
+
+    monkeypatch.setattr(server, "respond", final)
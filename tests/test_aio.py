@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+
+import timus_api
+from timus_api import VerdictWatcher
+from timus_api.client import Client
+
+from .fixtures import fail_pages, newest, pages, record_submits
+
+aio = pytest.importorskip("timus_api.aio")
+
+code = "program a;\nbegin\n  writeln(1);\nend.\n"
+
+
+@pytest.fixture
+def watcher(monkeypatch):
+    w = VerdictWatcher(interval=0.02, max_interval=0.1, delay=0)
+    monkeypatch.setattr(timus_api, "watcher", w)
+    return w
+
+
+def test_aio_submit_deduplicates(server, monkeypatch, watcher):
+    # same dedup as the blocking submit, shared through timus_api.submit_cache
+    forms = record_submits(server, monkeypatch)
+    kwargs = {"judge_id": "100001AA", "task_id": 1000, "lang": "62"}
+
+    async def main():
+        first = await aio.submit(code, **kwargs)
+        again = await aio.submit(code.replace("\n", "\r\n"), **kwargs)
+        forced = await aio.submit(code, force=True, **kwargs)
+        st = await aio.submit_sync(code, judge_id="100002BB", task_id=1000, lang="62", timeout=5)
+        await aio.close()
+        return first, again, forced, st
+
+    first, again, forced, st = asyncio.run(main())
+    assert (int(first), int(again), int(forced), st.submit_id) == (newest + 1, newest + 1, newest + 2, newest + 3)
+    assert len(forms) == 3
+    assert timus_api.submit_cache.status(newest + 3) == st
+    assert int(timus_api.submit(code, judge_id="100002BB", task_id=1000, lang="62")) == newest + 3
+    assert len(forms) == 3
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await aio.close()
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("spec", [
+    {"count": 1500},
+    {"from": newest - 10, "count": 2500},
+    {"from": newest - 10, "upto": newest - 2100},
+    {"upto": newest - 900},
+    {"from": float(pages.timestamp(newest - 500)), "upto": float(pages.timestamp(newest - 1700))},
+    {"from": newest, "count": 1200, "lang": "G++"},
+])
+def test_aio_status_iter_matches_blocking(server, spec):
+    assert run(aio.status(**spec)) == timus_api.status(**spec)
+
+
+def test_aio_pages(server):
+    assert run(aio.get_status(newest - 3)) == timus_api.get_status(newest - 3)
+    assert run(aio.author(7)) == timus_api.author(7)
+    assert run(aio.search("drbright")) == timus_api.search("drbright")
+
+
+def test_aio_shares_the_rate_limit(server, monkeypatch):
+    # asyncio and blocking requests draw from the same token bucket
+    monkeypatch.setattr(timus_api, "client", Client(base_url=server.url, rate=20, burst=1, retries=0))
+
+    async def main():
+        await asyncio.gather(*(aio.status_naked(**{"from": newest - i}) for i in range(5)))
+
+    start = time.monotonic()
+    timus_api.status_naked(**{"from": newest})
+    run(main())
+    assert time.monotonic() - start >= 5 / 20
+
+
+def test_aio_retries(server, monkeypatch):
+    monkeypatch.setattr(timus_api, "client", Client(base_url=server.url, rate=None, retries=2, backoff=0))
+    failures = []
+    respond = server.respond
+
+    def flaky(method, path, params, form):
+        if len(failures) < 2:
+            failures.append(method)
+            return 503, {}, "busy"
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", flaky)
+    assert len(run(aio.status_naked(**{"from": newest}))) == 1000
+    assert failures == ["GET", "GET"]
+    failures.clear()
+    with pytest.raises(RuntimeError):  # a POST that got an answer is never sent again
+        run(aio.submit(code, judge_id="100001AA", task_id=1000, lang="62"))
+    assert failures == ["POST"]
+
+    fail_pages(server, monkeypatch, lambda params: True)
+    with pytest.raises(RuntimeError):  # still failing after the retries: not an empty page
+        run(aio.status_naked(**{"from": newest}))
+
+
+def test_aio_submit_sync_timeout(server, monkeypatch):
+    monkeypatch.setattr(timus_api, "watcher", VerdictWatcher(delay=5))
+    with pytest.raises(asyncio.TimeoutError):
+        run(aio.submit_sync(code, judge_id="100001AA", task_id=1000, lang="62", timeout=0.1))
+    timus_api.watcher.cancel()
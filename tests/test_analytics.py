@@ -0,0 +1,72 @@
+import math
+from dataclasses import replace
+
+import pytest
+
+from timus_api import StatusStore, StatusTable, table
+from timus_api.analytics import Aggregate, acceptance_by_task, fastest_by_lang, timeline
+
+from .fixtures import newest, pages
+
+
+def stats(agg):
+    return {k: (s.count, s.accepted, s.runtime_min, round(s.runtime_sum, 6), s.memory_min, s.first, s.last)
+            for k, s in agg.items()}
+
+
+@pytest.mark.parametrize("by", [("task_id",), ("lang_code", "stat"), ("author_id", "timestamp")])
+def test_fold_table_matches_rows(monkeypatch, by):
+    rows = pages.status_rows(newest, 3000)
+    plain = Aggregate(*by, bucket=3600)
+    plain.fold(rows)
+    vectorized = Aggregate(*by, bucket=3600)
+    vectorized.fold(StatusTable(rows))
+    assert stats(vectorized) == stats(plain)
+    assert vectorized.pending == plain.pending and vectorized.watermark == plain.watermark
+    monkeypatch.setattr(table, "np", None)  # without numpy the table is folded row by row
+    fallback = Aggregate(*by, bucket=3600)
+    fallback.fold(StatusTable(rows))
+    assert stats(fallback) == stats(plain)
+
+
+def test_sync_folds_only_new_rows():
+    rows = pages.status_rows(newest, 2000)
+    store = StatusStore()
+    store.update(rows[1000:])
+    agg = Aggregate("task_id")
+    assert agg.sync(store) == sum(st.accepted is not None for st in rows[1000:])
+    waiting = {st.submit_id for st in rows[1000:] if st.accepted is None}
+    assert agg.pending == waiting and agg.watermark == rows[1000].submit_id
+
+    store.update(rows[:1000])
+    resolved = [replace(st, accepted=True, stat="ac", reason="Accepted") for st in rows[1000:] if st.accepted is None]
+    store.update(resolved)
+    folded = agg.sync(store)
+    assert folded == sum(st.accepted is not None for st in rows[:1000]) + len(resolved)
+    assert agg.watermark == newest and agg.pending == {st.submit_id for st in rows[:1000] if st.accepted is None}
+
+    final = {st.submit_id: st for st in [*rows, *resolved]}
+    fresh = Aggregate("task_id")
+    fresh.fold(final.values())
+    assert stats(agg) == stats(fresh)
+    assert agg.sync(store) == 0
+    store.close()
+
+
+def test_reports():
+    rows = [st for st in pages.status_rows(newest, 3000) if st.accepted is not None]
+    by_task = {}
+    for st in rows:
+        by_task.setdefault(st.task_id, []).append(st.accepted)
+    assert acceptance_by_task(rows) == {k: sum(v) / len(v) for k, v in by_task.items()}
+
+    fastest = {}
+    for st in rows:
+        if st.accepted:
+            fastest[st.lang_code] = min(fastest.get(st.lang_code, math.inf), st.runtime)
+    assert fastest_by_lang(StatusTable(rows)) == fastest
+
+    days = timeline(rows, bucket=86400)
+    assert sum(n for series in days.values() for _, n in series) == sum(st.accepted for st in rows)
+    series = next(iter(days.values()))
+    assert series == sorted(series) and all(stamp % 86400 == 0 for stamp, _ in series)
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import timus_api
+from timus_api import Backfill, StatusStore
+
+from .fixtures import fail_pages, newest, pages
+
+
+def test_backfill_resume(server, monkeypatch, tmp_path):
+    db = str(tmp_path / "status.sqlite3")
+    upto = newest - 6000
+    broken = str(newest - 2000 - 1000)  # second page of the second chunk
+    restore = fail_pages(server, monkeypatch, lambda params: params.get("from") == broken)
+    with StatusStore(db) as store:
+        job = Backfill(store, from_=newest, upto=upto, chunk=2000, workers=2, retries=1, backoff=0)
+        with pytest.raises(RuntimeError):
+            job.run()
+        assert set(job.errors) == {newest - 2000}
+        stored = len(store)
+    assert stored == 5000
+    with open(db + ".backfill.json", "rt", encoding="utf-8") as f:
+        assert json.load(f)["cursors"][str(newest - 2000)] == int(broken)
+
+    restore()
+    first = server.requests["status.aspx"]
+    with StatusStore(db) as store:
+        assert Backfill(store, from_=newest, upto=upto, chunk=2000, workers=2, backoff=0).run() == 6000
+        assert len(store) == 6000
+        assert [st.submit_id for st in store.status_iter(count=6000)] == [*range(newest, upto, -1)]
+    assert server.requests["status.aspx"] - first == 1  # only the missing page is fetched again
+
+
+def test_backfill_checkpoint_mismatch(server, tmp_path):
+    db = str(tmp_path / "status.sqlite3")
+    with StatusStore(db) as store:
+        Backfill(store, from_=newest, upto=newest - 1000, chunk=1000).run()
+        with pytest.raises(RuntimeError):
+            Backfill(store, from_=newest, upto=newest - 1000, chunk=500)
+
+
+def test_backfill_timestamp_bounds(server):
+    # timestamps resolve like status_iter's: the submission made exactly at `from_` is included
+    from_, upto = float(pages.timestamp(newest - 500)), float(pages.timestamp(newest - 1700))
+    with StatusStore() as store:
+        Backfill(store, from_=from_, upto=upto, chunk=1000).run()
+        got = [st.submit_id for st in store.status_iter(count=5000)]
+    want = [st.submit_id for st in timus_api.status_iter(**{"from": from_, "upto": upto})]
+    assert got == want == [*range(newest - 500, newest - 1700, -1)]
+
+
+def test_backfill_from_the_future(server):
+    with StatusStore() as store:
+        job = Backfill(store, from_=float(pages.timestamp(newest + 1000)), upto=newest - 10)
+        assert job.run() == 10
+        assert job.from_ == newest
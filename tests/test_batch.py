@@ -0,0 +1,125 @@
+import io
+
+import timus_api
+from timus_api import AccountPool, SubmitQueue, VerdictWatcher
+from timus_api.batch import batch_sources, print_summary
+
+from .fixtures import newest, record_submits, wait_until
+
+
+code = "#include <cstdio>\nint main() {\n    puts(\"%d\");\n}\n"
+
+
+def watcher():
+    return VerdictWatcher(interval=0.02, max_interval=0.1, delay=0)
+
+
+def test_default_judge_id_set_after_import(server, monkeypatch):
+    # batch reads timus_api.default_judge_id when it needs it, not once at import
+    forms = record_submits(server, monkeypatch)
+    monkeypatch.setattr(timus_api, "default_judge_id", "424242XX")
+    queue = SubmitQueue(window=0.01, watcher=watcher())
+    job = queue.put(code, task_id=1000, lang="58")
+    assert job.judge_id == "424242XX"
+    queue.run()
+    assert [form["JudgeID"] for form in forms] == ["424242XX"]
+    assert job.status.submit_id == newest + 1
+
+    pool = AccountPool(window=0.01, watcher=watcher())
+    job = pool.submit(code, task_id=1000, lang="58")  # known() checks the default account
+    assert (job.judge_id, job.submit_id, job.duplicate) == ("424242XX", newest + 1, True)
+    job = pool.submit(code, task_id=1001, lang="58")  # reserve() books the default account
+    assert job.judge_id == "424242XX" and [*pool.accounts] == ["424242XX"]
+    assert [form["JudgeID"] for form in forms] == ["424242XX", "424242XX"]
+
+
+def throttle_once(server, monkeypatch):
+    # the judge refuses the next submission: someone else just used the judge id
+    respond = server.respond
+    refused = []
+
+    def throttled(method, path, params, form):
+        if method == "POST" and path.strip("/").lower() == "submit.aspx" and not refused:
+            refused.append(form["JudgeID"])
+            return 200, {}, '<table><tr><td style="color:red">You should wait 10 seconds</td></tr></table>'
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", throttled)
+    return refused
+
+
+def test_queue_spreads_jobs_over_accounts(server, monkeypatch):
+    forms = record_submits(server, monkeypatch)
+    pool = AccountPool(["100001AA", "100002BB"], window=0.05, watcher=watcher())
+    queue = SubmitQueue(pool=pool)
+    jobs = [queue.put(code.replace("%d", str(i)), task_id=1000, lang="58") for i in range(4)]
+    jobs.append(queue.put(code, judge_id="100003CC", task_id=1000, lang="58"))
+    queue.run()
+    assert all(job.error is None and job.status is not None for job in jobs)
+    assert sorted(job.submit_id for job in jobs) == [*range(newest + 1, newest + 6)]
+    # judge-less jobs take whichever account is free first, the pinned one only goes through its own
+    assert jobs[-1].judge_id == forms[jobs[-1].submit_id - newest - 1]["JudgeID"] == "100003CC"
+    assert {form["JudgeID"] for form in forms} >= {"100001AA", "100002BB"}
+    stats = pool.stats()
+    assert sum(s["submitted"] for s in stats.values()) == 5
+    # the counters are updated by done callbacks, right after the verdicts are set
+    wait_until(lambda: sum(s["accepted"] + s["rejected"] for s in pool.stats().values()) == 5)
+
+    # the same sources again: every job points at its earlier submission, nothing is sent
+    again = SubmitQueue(pool=pool)
+    dups = [again.put(job.source, task_id=1000, lang="58") for job in jobs[:4]]
+    again.run()
+    assert [job.submit_id for job in dups] == [job.submit_id for job in jobs[:4]]
+    assert all(job.duplicate and job.status is not None for job in dups)
+    assert len(forms) == 5
+
+    forced = SubmitQueue(pool=pool, force=True)
+    job = forced.put(jobs[0].source, task_id=1000, lang="58")
+    forced.run()
+    assert (job.submit_id, job.duplicate, len(forms)) == (newest + 6, False, 6)
+
+
+def test_queue_requeues_throttled_jobs(server, monkeypatch):
+    refused = throttle_once(server, monkeypatch)
+    pool = AccountPool(["100001AA"], window=0.05, watcher=watcher())
+    queue = SubmitQueue(pool=pool)
+    job = queue.put(code, task_id=1000, lang="58")
+    queue.run()
+    assert refused == ["100001AA"]
+    assert job.submit_id == newest + 1 and job.status.submit_id == newest + 1
+    assert pool.stats()["100001AA"]["throttled"] == 1
+
+
+def test_pool_known_checks_every_account(server):
+    pool = AccountPool(["100001AA", "100002BB"], window=0.01, watcher=watcher())
+    first = timus_api.submit(code, judge_id="100002BB", task_id=1000, lang="58")
+    job = pool.submit(code, task_id=1000, lang="58")
+    assert (job.judge_id, job.submit_id, job.duplicate) == ("100002BB", int(first), True)
+    assert pool.submit_sync(code, task_id=1000, lang="58").submit_id == int(first)
+    job = pool.submit(code, judge_id="100001AA", task_id=1000, lang="58")  # an account of its own
+    assert (job.submit_id, job.duplicate) == (newest + 2, False)
+
+
+def test_print_summary(server, tmp_path):
+    source = tmp_path / "1000.cpp"
+    source.write_text(code)
+    assert batch_sources(str(tmp_path)) == [str(source)]
+    queue = SubmitQueue(window=0.01, watcher=watcher())
+    queue.put(str(source), judge_id="100001AA")
+    queue.put(str(tmp_path / "missing.cpp"), judge_id="100001AA", task_id=1000)
+    out = io.StringIO()
+    print_summary(queue.run(), file=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].split()[:3] == ["Source", "Task", "Judge"]
+    assert str(newest + 1) in lines[1] and "100001AA" in lines[1]
+    assert "Error" in lines[2] and lines[-1].endswith("of 2")
+
+
+def test_pool_uses_the_given_watcher(server):
+    # an idle watcher has no pending verdicts and is falsy; it must still be the one that's used
+    w = watcher()
+    assert not w
+    pool = AccountPool(window=0.01, watcher=w)
+    assert pool.watcher is w and SubmitQueue(watcher=w).pool.watcher is w
+    job = pool.submit(code, judge_id="100001AA", task_id=1000, lang="58")
+    assert job.verdict.result(1).submit_id == newest + 1 and w.requests == 1
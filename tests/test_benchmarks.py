@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+
+def test_benchmarks_leave_user_cache_alone(tmp_path):
+    # the synthetic pages must not end up in the real time index (or any other user cache)
+    cache = tmp_path / "cache"
+    out = tmp_path / "bench.json"
+    env = {**os.environ, "XDG_CACHE_HOME": str(cache)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--sizes", "1000", "--repeat", "1", "--only", "naked,iter,cached",
+         "-o", str(out)],
+        cwd=root, env=env, check=True, capture_output=True, timeout=300
+    )
+    results = json.loads(out.read_text())["results"]
+    assert {r["bench"] for r in results} >= {"status_naked", "status_iter", "status_cached"}
+    assert not cache.exists() or os.listdir(cache) == []
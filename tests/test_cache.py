@@ -0,0 +1,63 @@
+import timus_api
+from timus_api import PageCache
+
+from .fixtures import judged, newest
+
+
+def fetch(**params):
+    return timus_api.status_naked(**params)
+
+
+def test_final_pages_are_cached(server, monkeypatch):
+    judged(server, monkeypatch)
+    below = {"from": newest - 1000}
+    assert fetch(**below) == fetch(**below)
+    assert server.requests["status.aspx"] == 1
+    assert timus_api.page_cache.hits == 1
+    fetch()
+    fetch()  # the head of the table changes with every submission
+    assert server.requests["status.aspx"] == 3
+
+
+def test_pending_verdicts_are_refetched(server):
+    server.newest = newest + 300  # the synthetic judge is still running some of these
+    page = {"from": newest + 200}
+    assert any(st.accepted is None for st in fetch(**page))
+    fetch(**page)
+    assert server.requests["status.aspx"] == 2
+
+
+def test_ttl(server, monkeypatch):
+    monkeypatch.setattr(timus_api, "page_cache", PageCache(ttl=60))
+    fetch()
+    fetch()
+    assert server.requests["status.aspx"] == 1
+
+
+def test_disk_cache(server, monkeypatch, tmp_path):
+    judged(server, monkeypatch)
+    monkeypatch.setattr(timus_api, "page_cache", PageCache(path=str(tmp_path)))
+    rows = fetch(**{"from": newest - 1000})
+    monkeypatch.setattr(timus_api, "page_cache", PageCache(path=str(tmp_path)))
+    assert fetch(**{"from": newest - 1000}) == rows
+    assert server.requests["status.aspx"] == 1
+
+
+def test_lru_eviction():
+    cache = PageCache(max_bytes=2500, level=0)
+    for i in range(5):
+        cache.put(f"k{i}", "x" * 1000, start=1, newest=10, final=True)
+    assert [*cache.entries] == ["k3", "k4"] and cache.size <= 2500
+    assert cache.get("k0") is None and cache.get("k3").data == "x" * 1000
+    cache.put("k5", "y" * 1000, start=1, final=True)
+    assert [*cache.entries] == ["k3", "k5"]  # k3 was just used, k4 goes
+
+
+def test_validators():
+    cache = PageCache(ttl=0.0)
+    cache.put("head", "page", headers={"ETag": '"v1"', "Last-Modified": "Sun, 18 Oct 2026 00:00:00 GMT"})
+    assert cache.get("head") is None  # not immutable and no ttl: not kept
+    cache = PageCache(ttl=60)
+    cache.put("head", "page", headers={"ETag": '"v1"'})
+    entry = cache.get("head")
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
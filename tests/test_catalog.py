@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+import timus_api
+from timus_api import Catalog
+from timus_api.catalog import parse_problemset, parse_volumes
+
+from .fixtures import pages
+
+
+def test_refresh_and_lookup(server, tmp_path):
+    path = str(tmp_path / "problems.sqlite3")
+    catalog = Catalog(path)
+    assert not catalog.available() and catalog.exists(1000) is None
+    assert catalog.refresh() == 300
+    assert server.requests["problemset.aspx"] == 3
+    p = catalog.get(1001)
+    assert (p.id, p.title, p.volume) == (1001, "Problem 1001 & Sum", 1)
+    assert p.solved == random.Random(1001).randrange(1, 200000)
+    assert p.difficulty == random.Random(-1001).randrange(1, 1000)
+    assert (catalog.exists(1000), catalog.exists(1299), catalog.exists(999), catalog.exists(1300)) == (
+        True, True, False, None  # ids past the newest problem may have been added since
+    )
+    catalog.close()
+
+    catalog = Catalog(path)  # persisted
+    assert len(catalog) == 300 and catalog.ensure() == 0
+    assert server.requests["problemset.aspx"] == 3
+    assert catalog.refresh() == 100  # only the last volume, where new problems appear
+    assert server.requests["problemset.aspx"] == 5
+    catalog.close()
+
+
+def test_search(server):
+    catalog = Catalog()
+    catalog.refresh()
+    found = catalog.search("sum", limit=100)
+    assert sorted(p.id for p in found) == [n for n in range(1000, 1300) if n % 7 == 0]
+    assert [p.solved for p in found] == sorted((p.solved for p in found), reverse=True)  # most solved first
+    assert [p.id for p in catalog.search("1050")] == [1050]
+    assert {p.id for p in catalog.search("problem 12 SUM", limit=100)} == {
+        n for n in range(1000, 1300) if n % 7 == 0 and "12" in str(n)
+    }
+    assert catalog.search("100%") == [] and catalog.search("_") == []  # LIKE wildcards are literal
+
+
+def test_submit_checks_catalog(server, monkeypatch):
+    catalog = Catalog()
+    catalog.refresh()
+    monkeypatch.setattr(timus_api, "catalog", catalog)
+    with pytest.raises(RuntimeError, match="not in the problem set"):
+        timus_api.submit("program a; begin end.", judge_id="100001AA", task_id=999, lang="62")
+    assert "submit.aspx" not in server.requests
+    assert int(timus_api.submit("program a; begin end.", judge_id="100001AA", task_id=1000, lang="62")) > 0
+
+
+def test_parse_problemset():
+    problems = parse_problemset(pages.problemset_page(2))
+    assert [p.id for p in problems] == [*range(1100, 1200)]
+    assert problems[6].title == "Problem 1106 & Sum" and problems[6].volume == 2
+    assert parse_volumes(pages.problemset_page(2, volumes=12)) == 12
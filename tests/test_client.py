@@ -0,0 +1,46 @@
+import time
+
+import pytest
+import requests as rqs
+
+from timus_api.client import Client
+from timus_api.metrics import Metrics
+
+from .fixtures import wait_until
+
+
+def slow(server, monkeypatch, delay):
+    # answers after `delay` seconds; returns the requests received so far per method
+    respond = server.respond
+    received = {}
+
+    def sleeping(method, path, params, form):
+        received[method] = received.get(method, 0) + 1
+        time.sleep(delay)
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", sleeping)
+    return received
+
+
+def test_post_not_retried_after_read_timeout(server, monkeypatch):
+    # the judge may have accepted a submission that timed out; sending it again would submit twice
+    received = slow(server, monkeypatch, 0.5)
+    client = Client(base_url=server.url, timeout=(2, 0.1), rate=None, retries=3, backoff=0)
+    with pytest.raises(rqs.ReadTimeout):
+        client.post("submit.aspx?space=1", data={"Source": "x"}, allow_redirects=False)
+    with pytest.raises(rqs.ReadTimeout):
+        client.get("status.aspx", params={"count": 1})
+    wait_until(lambda: received.get("GET") == 4)  # the handler threads may lag behind the client
+    assert received == {"POST": 1, "GET": 4}
+
+
+def test_post_retried_when_connect_fails(server):
+    host, port = server.server_address[:2]
+    server.stop()
+    metrics = Metrics()
+    client = Client(base_url=f"http://{host}:{port}", timeout=(0.5, 0.5), rate=None, retries=2, backoff=0,
+                    metrics=metrics)
+    with pytest.raises(rqs.ConnectionError):
+        client.post("submit.aspx?space=1", data={"Source": "x"})
+    assert metrics.snapshot()["timus_requests_total"]["submit.aspx"] == 3  # nothing reached the judge
@@ -0,0 +1,81 @@
+import timus_api
+from timus_api import SubmitCache, data_key, submit_data
+from timus_api.dedup import default_path
+
+from .fixtures import newest, unwritable_cache
+
+
+code = "#include <cstdio>\nint main() {\n    int a, b;\n    scanf(\"%d%d\", &a, &b);\n    printf(\"%d\", a + b);\n}\n"
+
+
+def send(**kwargs):
+    kwargs = {"judge_id": "100001AA", "task_id": 1000, "lang": "58", **kwargs}
+    return int(timus_api.submit(kwargs.pop("code", code), **kwargs))
+
+
+def test_submit_cache_keying(server):
+    first = send()
+    assert first == newest + 1
+    # reformatting doesn't make a new submission
+    assert send(code=code.replace("\n", "   \r\n")) == first
+    assert send(code="\n\n" + code + "\n\n") == first
+    assert server.requests["submit.aspx"] == 1
+    # everything the judge tells apart does
+    assert send(judge_id="100002BB") == newest + 2
+    assert send(task_id=1001) == newest + 3
+    assert send(lang="59") == newest + 4
+    assert send(code=code.replace("a + b", "b + a")) == newest + 5
+    assert send(force=True) == newest + 6
+    assert server.requests["submit.aspx"] == 6
+    assert send(judge_id="100002BB") == newest + 2
+
+
+def test_submit_cache_key():
+    data = {"Source": code.encode(), "ProblemNum": "1000", "Language": "58", "JudgeID": "100001AA"}
+    assert data_key(data) == data_key({**data, "Source": code.replace("\n", "\r\n").encode()})
+    for k, v in (("JudgeID", "100002BB"), ("ProblemNum", "1001"), ("Language", "59")):
+        assert data_key({**data, k: v}) != data_key(data)
+
+
+def test_submit_cache_persists(server, tmp_path):
+    path = str(tmp_path / "submits.sqlite3")
+    cache = SubmitCache(path)
+    data = submit_data(code, judge_id="100001AA", task_id=1000, lang="58")
+    cache.put(data_key(data), 1000050, data)
+    st = timus_api.status_naked(count=1, **{"from": 1000050})[0]
+    cache.verdict(st)
+    cache.close()
+
+    cache = SubmitCache(path)
+    assert cache.lookup(code, judge_id="100001AA", task_id=1000, lang="58") == (1000050, st)
+    assert cache.lookup(code, judge_id="100002BB", task_id=1000, lang="58") is None
+    assert cache.status(1000050) == st
+    cache.close()
+
+
+def test_submit_sync_reuses_verdict(server):
+    first = send()
+    st = timus_api.status_naked(count=1, **{"from": first})[0]
+    timus_api.submit_cache.verdict(st)
+    before = dict(server.requests)
+    assert timus_api.submit_sync(code, judge_id="100001AA", task_id=1000, lang="58") == st
+    assert server.requests == before
+
+
+def test_submit_without_writable_cache(server, monkeypatch, tmp_path):
+    # the judge got the submission: a cache that can't be written must not hide its id
+    unwritable_cache(monkeypatch, tmp_path)
+    monkeypatch.setattr(timus_api, "submit_cache", SubmitCache(default_path()))
+    assert send() == newest + 1
+    assert send() == newest + 2  # dedup is off
+    assert timus_api.submit_cache.broken and len(timus_api.submit_cache) == 0
+    st = timus_api.status_naked(count=1, **{"from": newest + 2})[0]
+    timus_api.submit_cache.verdict(st)
+
+
+def test_submit_with_corrupt_cache(server, monkeypatch, tmp_path):
+    path = tmp_path / "submits.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    monkeypatch.setattr(timus_api, "submit_cache", SubmitCache(str(path)))
+    assert send() == newest + 1
+    assert timus_api.submit_cache.get("key") is None
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from timus_api.export import export_status
+
+from .fixtures import fail_pages, newest
+
+
+def read_ids(path):
+    with open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line)["submit_id"] for line in f]
+
+
+def test_export_resume(server, monkeypatch, tmp_path):
+    path = str(tmp_path / "status.jsonl")
+    restore = fail_pages(server, monkeypatch, lambda params: params.get("from") == str(newest - 2000))
+    with pytest.raises(RuntimeError):
+        export_status(path, **{"from": newest, "count": 3500})
+    assert read_ids(path) == [*range(newest, newest - 2000, -1)]
+
+    with open(path, "rb+") as f:  # interrupted in the middle of a row
+        f.seek(-40, 2)
+        f.truncate()
+    restore()
+    assert export_status(path, resume=True, **{"from": newest, "count": 3500}) == 1501
+    assert read_ids(path) == [*range(newest, newest - 3500, -1)]
+    assert export_status(path, resume=True, **{"from": newest, "count": 3500}) == 0
+
+
+def test_export_resume_csv(server, tmp_path):
+    path = str(tmp_path / "status.csv")
+    export_status(path, **{"from": newest, "count": 1200})
+    assert export_status(path, resume=True, **{"from": newest, "count": 2000}) == 800
+    with open(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("submit_id,") and len(lines) == 2001
+    assert [int(line.split(",")[0]) for line in lines[1:]] == [*range(newest, newest - 2000, -1)]
@@ -0,0 +1,60 @@
+import timus_api
+from timus_api.client import Client
+from timus_api.metrics import Metrics, endpoint, registry
+
+from .fixtures import fail_pages, newest
+
+
+def test_client_metrics(server, monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(timus_api, "client", Client(base_url=server.url, rate=None, retries=2, backoff=0,
+                                                    metrics=metrics))
+    timus_api.status_naked(**{"from": newest})
+    restore = fail_pages(server, monkeypatch, lambda params: params.get("from") == str(newest - 1000))
+    try:
+        timus_api.status_naked(**{"from": newest - 1000})
+    except RuntimeError:
+        pass
+    restore()
+    m = metrics.snapshot()
+    assert m["timus_requests_total"]["status.aspx"] == 4
+    assert m["timus_retries_total"]["status.aspx"] == 2
+    assert m["timus_request_errors_total"]["status.aspx"] == 3
+    assert m["timus_request_seconds"]["status.aspx"]["count"] == 4
+    assert m["timus_response_bytes_total"]["status.aspx"] > 100000
+
+
+def test_parser_metrics(server):
+    before = registry.snapshot().get("timus_rows_parsed_total", {}).get("status.aspx", 0)
+    timus_api.status_naked(**{"from": newest})
+    assert registry.snapshot()["timus_rows_parsed_total"]["status.aspx"] - before == 1000
+
+
+def test_prometheus_and_hooks():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    seen = []
+    hook = metrics.add_hook(lambda *args: seen.append(args))
+    metrics.inc("timus_requests_total", "status.aspx", 2)
+    metrics.observe("timus_request_seconds", "status.aspx", 0.5)
+    with metrics.timer("timus_parse_seconds", "author.aspx"):
+        pass
+    assert seen[0] == ("timus_requests_total", "status.aspx", 2) and len(seen) == 3
+    text = metrics.prometheus()
+    assert 'timus_requests_total{endpoint="status.aspx"} 2' in text
+    assert 'timus_request_seconds_bucket{endpoint="status.aspx",le="0.1"} 0' in text
+    assert 'timus_request_seconds_bucket{endpoint="status.aspx",le="1"} 1' in text
+    assert 'timus_request_seconds_bucket{endpoint="status.aspx",le="+Inf"} 1' in text
+    assert 'timus_request_seconds_count{endpoint="status.aspx"} 1' in text
+    assert "# TYPE timus_parse_seconds histogram" in text
+    metrics.remove_hook(hook)
+    metrics.enabled = False
+    metrics.inc("timus_requests_total", "status.aspx")
+    assert metrics.snapshot()["timus_requests_total"]["status.aspx"] == 2 and len(seen) == 3
+    metrics.reset()
+    assert metrics.snapshot() == {} and metrics.prometheus() == ""
+
+
+def test_endpoint():
+    assert endpoint("https://acm.timus.ru/status.aspx?space=1&count=1000") == "status.aspx"
+    assert endpoint("submit.aspx?space=1") == "submit.aspx"
+    assert endpoint("/Author.aspx") == "author.aspx"
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import timus_api
+from timus_api import StatusStore, StatusTable
+
+from .fixtures import data_path, fail_pages, newest, pages
+
+
+gmt5 = timezone(timedelta(hours=5))
+
+
+def read_fixture(name):
+    with open(data_path(name), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_status_page(monkeypatch):
+    monkeypatch.setattr(timus_api, "supported_langs_cache", pages.supported_langs())
+    rows = timus_api.parse_status(read_fixture("status.html"))
+    assert [st.submit_id for st in rows] == [10571246, 10571245, 10571244, 10571243, 10571242]
+
+    running, ac, tle, ce, wa = rows
+    assert (running.stat, running.accepted, running.reason, running.test) == ("wt", None, "Running", 3)
+    assert (running.runtime, running.memory) == (0, 0)
+    assert running.timestamp == datetime(2026, 10, 19, 0, 0, 12, tzinfo=gmt5).timestamp()
+
+    assert (ac.stat, ac.accepted, ac.reason, ac.test) == ("ac", True, "Accepted", 0)
+    assert (ac.author_id, ac.author_name) == ("320816", "drbright")
+    assert (ac.task_id, ac.task_name) == ("1000", "A+B Problem")
+    assert (ac.lang_name, ac.lang_code) == ("Python 3.8 x64", "57")
+    assert (ac.runtime, ac.memory) == (0.062, 596)
+    assert ac.timestamp == datetime(2026, 10, 18, 23, 59, 58, tzinfo=gmt5).timestamp()
+
+    # own submissions link the id to the source
+    assert (tle.stat, tle.accepted, tle.reason, tle.test) == ("rj", False, "Time limit exceeded", 12)
+    assert (tle.runtime, tle.memory, tle.lang_code) == (1.014, 11372, "59")
+
+    assert (ce.reason, ce.test, ce.runtime, ce.memory) == ("Compilation error", 0, 0, 0)
+    assert ce.author_name == "Anna &amp; Co"
+    assert (wa.test, wa.memory, wa.lang_code) == (1, 1024, "62")
+
+
+def test_status_find_bounds(server):
+    for sid in (newest - 10, newest - 12345, newest - 654321):
+        ts = float(pages.timestamp(sid))
+        lo, hi = timus_api.status_find(ts)
+        assert lo == sid  # an exact match is the lower bound
+        lo, hi = timus_api.status_find(ts + 10)  # between two submissions
+        assert pages.timestamp(lo) <= ts + 10 <= pages.timestamp(hi)
+        assert hi - lo <= 1
+
+
+def test_status_find_probes_use_time_index(server):
+    ts = float(pages.timestamp(newest - 50000))
+    assert timus_api.status_find(ts).probes > 0
+    before = sum(server.requests.values())
+    assert timus_api.status_find(ts)[0] == newest - 50000
+    assert sum(server.requests.values()) - before <= 1
+
+
+def test_status_iter_timestamp_slice(server):
+    from_, upto = newest - 100, newest - 2600
+    # ints are submit ids, timestamps are floats or datetimes
+    since = datetime.fromtimestamp(pages.timestamp(from_) + 5, timezone.utc)
+    rows = [*timus_api.status_iter(**{"from": since, "upto": float(pages.timestamp(upto))})]
+    assert [st.submit_id for st in rows] == [*range(from_, upto, -1)]
+
+
+def test_status_iter_count(server):
+    rows = [*timus_api.status_iter(**{"from": newest - 3, "count": 2500})]
+    assert [st.submit_id for st in rows] == [*range(newest - 3, newest - 2503, -1)]
+    assert server.requests["status.aspx"] == 3
+
+
+def test_status_iter_server_error(server, monkeypatch):
+    # a failing page must raise instead of ending the slice early
+    fail_pages(server, monkeypatch, lambda params: params.get("from") == str(newest - 1000))
+    with pytest.raises(RuntimeError):
+        [*timus_api.status_iter(**{"from": newest, "count": 3000})]
+
+
+@pytest.fixture(params=["list", "store", "table"])
+def cache(request):
+    rows = pages.status_rows(newest, 3000)
+    if request.param == "store":
+        store = StatusStore()
+        store.update(rows)
+        yield store
+        store.close()
+    elif request.param == "table":
+        yield StatusTable(rows)
+    else:
+        yield rows
+
+
+def test_status_cached_iter_count(cache):
+    rows = pages.status_rows(newest, 3000)
+    got = [*timus_api.status_cached_iter(cache, count=10)]
+    assert [st.submit_id for st in got] == [*range(newest, newest - 10, -1)]
+    assert [*timus_api.status_cached_iter(cache, count=0)] == []
+
+    got = [*timus_api.status_cached_iter(cache, count=5, **{"from": newest - 100, "upto": newest - 103})]
+    assert [st.submit_id for st in got] == [newest - 100, newest - 101, newest - 102]
+
+    author = rows[1234].author_id
+    want = [st.submit_id for st in rows if st.author_id == author][:1]
+    got = [*timus_api.status_cached_iter(cache, author=int(author), count=1)]
+    assert [st.submit_id for st in got] == want
+    assert all(type(st.author_id) is str for st in got)
+
+    ac = [st.submit_id for st in rows if st.accepted][:7]
+    assert [st.submit_id for st in timus_api.status_cached_iter(cache, status="accepted", count=7)] == ac
+
+
+def test_status_cached_timestamps(cache):
+    from_, upto = newest - 10, newest - 20
+    bounds = {"from": float(pages.timestamp(from_)), "upto": float(pages.timestamp(upto))}
+    got = timus_api.status_cached(cache, **bounds)
+    assert [st.submit_id for st in got] == [*range(from_, upto, -1)]
+
+
+def test_status_iter_parallel(server):
+    rows = [*timus_api.status_iter(**{"from": newest - 10, "upto": newest - 5010}, workers=4)]
+    assert [st.submit_id for st in rows] == [*range(newest - 10, newest - 5010, -1)]
+    assert server.requests["status.aspx"] == 5
+
+
+def test_status_iter_parallel_filtered(server, monkeypatch):
+    # an author's rows are sparse: paging through them beats fetching every 1000-id window of the range
+    respond = server.respond
+
+    def sparse(method, path, params, form):
+        if path.strip("/").lower() == "status.aspx" and "author" in params:
+            start = min(int(params.get("from", server.newest)), server.newest)
+            ids = range(start - start % 500, 0, -500)[:int(params.get("count", 1000))]
+            with server.lock:
+                server.requests["status.aspx"] = server.requests.get("status.aspx", 0) + 1
+            rows = "".join(map(pages.status_row, ids))
+            return 200, {}, pages.status_page(0, 0).replace("</TABLE>", rows + "</TABLE>")
+        return respond(method, path, params, form)
+
+    monkeypatch.setattr(server, "respond", sparse)
+    rows = [*timus_api.status_iter(author=7, workers=8, **{"from": newest, "upto": newest - 1_000_000})]
+    assert [st.submit_id for st in rows] == [*range(newest - newest % 500, newest - 1_000_000, -500)]
+    assert server.requests["status.aspx"] <= 3  # not one per 1000-id window
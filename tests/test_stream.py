@@ -0,0 +1,77 @@
+import asyncio
+import queue
+
+import pytest
+
+from timus_api.stream import AsyncSubscription, CallbackSubscription, StatusFeed, Subscription
+
+from .fixtures import fail_pages, newest, wait_until
+
+
+def next_event(subscription, timeout=5.0):
+    return subscription.queue.get(timeout=timeout)
+
+
+def feed():
+    return StatusFeed(interval=0.02, max_interval=0.05)
+
+
+def test_feed_new_submissions(server):
+    f = feed()
+    with f.subscribe(Subscription(f)) as sub:
+        wait_until(lambda: f.newest is not None)  # baseline
+        server.newest += 2
+        events = [next_event(sub), next_event(sub)]
+    assert [(e.kind, e.status.submit_id) for e in events] == [("new", newest + 1), ("new", newest + 2)]
+
+
+def test_feed_survives_failing_subscribers(server):
+    # a raising callback or a subscriber whose event loop is gone must not stop the others' events
+    f = feed()
+
+    def broken(event):
+        raise ValueError(event)
+
+    async def subscribe():
+        return f.subscribe(AsyncSubscription(f))
+
+    failing = f.subscribe(CallbackSubscription(f, broken))
+    gone = asyncio.run(subscribe())
+    with f.subscribe(Subscription(f)) as sub:
+        wait_until(lambda: f.newest is not None)
+        for i in range(1, 4):
+            server.newest += 1
+            assert next_event(sub).status.submit_id == newest + i
+        assert gone not in f.subscribers
+        assert f.thread.is_alive()
+        failing.close()
+    wait_until(lambda: f.thread is None)  # the poller stops with the last subscriber
+
+
+def test_feed_reports_errors_and_recovers(server, monkeypatch):
+    f = feed()
+    with f.subscribe(Subscription(f)) as sub:
+        wait_until(lambda: f.newest is not None)
+        restore = fail_pages(server, monkeypatch, lambda params: True)
+        event = next_event(sub)
+        assert event.kind == "error" and event.status is None and isinstance(event.error, RuntimeError)
+        restore()
+        server.newest += 1
+        while (event := next_event(sub)).kind == "error":
+            pass
+        assert (event.kind, event.status.submit_id) == ("new", newest + 1)
+
+
+def test_feed_restarts_after_last_subscriber(server):
+    f = feed()
+    f.subscribe(Subscription(f)).close()
+    f.thread and f.thread.join(5)
+    assert f.thread is None and f.newest is None
+    server.newest += 5000  # happened while nobody watched
+    with f.subscribe(Subscription(f)) as sub:
+        wait_until(lambda: f.newest is not None)
+        server.newest += 1
+        event = next_event(sub)
+        assert event.status.submit_id == newest + 5001
+        with pytest.raises(queue.Empty):  # the stale ones aren't replayed
+            next_event(sub, 0.2)
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+from timus_api import StatusTable, table
+
+from .fixtures import newest, pages
+
+
+def test_import_skips_numpy():
+    # numpy costs more than the rest of the package to import, only StatusTable work may load it
+    code = "import sys, timus_api; print('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_table_where(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(table, "np", None)
+    rows = pages.status_rows(newest, 2000)
+    t = StatusTable(rows)
+    assert [st.submit_id for st in t.where(status="accepted", lang="G++")] == [
+        st.submit_id for st in rows if st.accepted and st.lang_code == "58"
+    ]
+    assert len(t.where(**{"from": newest - 10, "upto": newest - 20})) == 10
+    assert len(t.where(author="no such author")) == 0
+    assert len(t.where()) == 2000
+    assert t.row(5) == rows[5]
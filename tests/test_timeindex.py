@@ -0,0 +1,33 @@
+import timus_api
+from timus_api import TimeIndex
+from timus_api.timeindex import default_path
+
+from .fixtures import newest, pages, unwritable_cache
+
+
+def test_time_index_persists(server, monkeypatch, tmp_path):
+    path = str(tmp_path / "timeindex.json")
+    monkeypatch.setattr(timus_api, "time_index", TimeIndex(path))
+    timus_api.status_find(float(pages.timestamp(newest - 30000)))
+    assert not timus_api.time_index.dirty
+    samples = len(timus_api.time_index)
+    assert samples > 0 and len(TimeIndex(path)) == samples
+
+
+def test_status_find_without_writable_cache(server, monkeypatch, tmp_path):
+    unwritable_cache(monkeypatch, tmp_path)
+    index = TimeIndex(default_path())
+    monkeypatch.setattr(timus_api, "time_index", index)
+    assert timus_api.status_find(float(pages.timestamp(newest - 30000)))[0] == newest - 30000
+    assert index.dirty and len(index) > 0  # kept for a later save
+    index.save()
+
+
+def test_time_index_ignores_unreadable_copy(tmp_path):
+    path = tmp_path / "timeindex.json"
+    path.write_text("{not json")
+    index = TimeIndex(str(path))
+    assert len(index) == 0
+    index.insert(1, 2.0)
+    index.save()
+    assert TimeIndex(str(path)).bracket(3.0) == ((1, 2.0), None)
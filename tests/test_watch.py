@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+import timus_api
+from timus_api import VerdictWatcher
+
+from .fixtures import fail_pages, newest, wait_until
+
+
+def watcher(**kwargs):
+    return VerdictWatcher(**{"interval": 0.02, "max_interval": 0.05, "delay": 0, **kwargs})
+
+
+def test_one_request_for_many_verdicts(server):
+    w = watcher(delay=0.1)  # lets all of them queue up before the first poll
+    futures = {sid: w.add(sid) for sid in range(newest - 300, newest, 37)}
+    for sid, future in futures.items():
+        assert future.result(5).submit_id == sid
+    assert w.requests == 1 and server.requests["status.aspx"] == 1
+    assert len(w) == 0
+
+
+def test_waits_for_running_submissions(server):
+    server.newest = newest + 200  # the synthetic judge is still running some of these
+    w = watcher()
+    running = [st.submit_id for st in timus_api.status_naked(**{"from": newest + 200}) if st.accepted is None]
+    assert running
+    future = w.add(running[0])
+    time.sleep(0.2)
+    assert not future.done() and w.requests > 1
+    w.cancel()
+    assert future.cancelled()
+
+
+def test_fails_pending_when_judge_stays_down(server, monkeypatch):
+    restore = fail_pages(server, monkeypatch, lambda params: True)
+    w = watcher(max_failures=3)
+    futures = [w.add(newest - 5), w.add(newest - 1)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+    assert w.requests == 3 and len(w) == 0
+    restore()
+    assert w.wait(newest - 5, 5).submit_id == newest - 5  # a later submission starts a new poller
+
+
+def test_wait_timeout(server, monkeypatch):
+    fail_pages(server, monkeypatch, lambda params: True)
+    w = watcher(max_failures=1000)
+    with pytest.raises(TimeoutError):
+        w.wait(newest, 0.2)
+    monkeypatch.setattr(timus_api, "watcher", w)
+    with pytest.raises(TimeoutError):
+        timus_api.submit_sync("program a; begin end.", judge_id="100001AA", task_id=1000, lang="62", timeout=0.2)
+    w.cancel()
+
+
+def test_callbacks(server):
+    seen = []
+    w = watcher(callback=lambda st: seen.append(("all", st.submit_id)))
+    w.add(newest - 1, callback=lambda st: seen.append(("one", st.submit_id))).result(5)
+    wait_until(lambda: len(seen) == 2)  # callbacks run right after the result is set
+    assert sorted(seen) == [("all", newest - 1), ("one", newest - 1)]
@@ -1,3 +1,5 @@
+import atexit
+import html
 import io
 import math
 import os.path
@@ -5,17 +7,33 @@ import re
 import sys
 import time
 import itertools
+import functools
+from collections import deque
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime
-import requests as rqs
+from datetime import datetime, timedelta, timezone
+from . import metrics
+from .cache import PageCache
+from .client import Client, RateLimiter
+from .langs import LangTable, default_path as default_langs_path
+from .timeindex import TimeIndex, default_path as default_timeindex_path
 
 
 # TODO: docstrings
-# TODO: automatic testing
 
 default_judge_id = "320816ZW"
 
+client = Client()  # replace to change base url, timeouts, rate limits or retries
+
+# (submit_id, timestamp) samples of every fetched page, seeds status_find; kept in the user cache so it
+# grows across runs (saved after each status_find and at exit), TimeIndex() keeps it in memory only
+time_index = TimeIndex(default_timeindex_path())
+atexit.register(lambda: time_index.save())
+
+# status.aspx pages that can no longer change are cached; give it a ttl to also reuse recent pages
+page_cache = PageCache()
+
 language_detector = {
     "py": "Python",
     "c": "GCC",
@@ -34,23 +52,27 @@ submit_form = {  # action = "https://acm.timus.ru/submit.aspx?space=1"
     "Source": None
 }
 
+# submit.aspx language table, kept on disk for a week and refreshed in the background once stale;
+# pass path=None for a per-process table, or set supported_langs_cache to pin one
+lang_table = LangTable(default_langs_path())
 supported_langs_cache = None
 
 
 def supported_langs():
-    global supported_langs_cache
     if supported_langs_cache is not None:
         return supported_langs_cache
-    data = rqs.get('https://acm.timus.ru/submit.aspx').text
+    return lang_table.get()
+
+
+@metrics.registry.parser("submit.aspx")
+def parse_langs(data):
     p_select = re.compile(r'<select name="Language".*?>.*?</select>', re.I)
     data = p_select.findall(data)[0]
     p_option = re.compile(r'<option value="(.*?)">(.*?)</option>', re.I)
-    rsp = {name: code for code, name in p_option.findall(data)}
-    supported_langs_cache = rsp
-    return rsp
+    return {name: code for code, name in p_option.findall(data)}
 
 
-@dataclass
+@dataclass(slots=True)
 class SubmitStatus:
     submit_id: int | None = None
     timestamp: float | None = None
@@ -65,22 +87,31 @@ class SubmitStatus:
     task_name: str | None = None
     lang_name: str | None = None
     lang_code: int | None = None
+    stat: str | None = None  # verdict class: ac, rj or wt
 
     def __getitem__(self, k):
-        return self.__dict__[k]
+        return getattr(self, k)
 
     def __setitem__(self, k, v):
-        self.__dict__[k] = v
+        setattr(self, k, v)
         return True
 
-    def __getattr__(self, k):
-        return getattr(self.__dict__, k)
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.__slots__]
+
+    def get(self, k, default=None):
+        return getattr(self, k, default)
 
     def __iter__(self):
-        return self.keys()
+        return iter(self.keys())
 
 
-# TODO: implement proper author.aspx parser for this dataclass
 @dataclass
 class Author:
     id: int | None = None
@@ -111,61 +142,128 @@ def status_naked(count=math.inf, upto=None, lang=None, **kwargs) -> list[SubmitS
     # supports author, num, status, count, from, upto, lang
     if count == 0:
         return []
+    return filter_status(status_page(status_params(kwargs)), count=count, upto=upto, lang=lang)
+
+
+def status_page(params) -> list[SubmitStatus]:
+    # one parsed status.aspx page, served from page_cache when possible
+    rsp = status_page_fetch(params)
+    time_index.add(rsp)
+    return rsp
+
+
+def status_get(params, headers=None):
+    r = client.get("status.aspx", params=params, headers=headers)
+    if r.status_code >= 500:  # still failing after the client's retries; an empty page would end status_iter
+        raise RuntimeError(r, r.status_code)
+    return r
+
+
+def status_page_fetch(params) -> list[SubmitStatus]:
+    if page_cache is None:
+        return parse_status(status_get(params).content.decode('utf-8'))
+    key = page_cache.key("status.aspx", params)
+    entry = page_cache.get(key)
+    if entry is not None and entry.fresh():
+        return parse_status(entry.data)
+    r = status_get(params, headers=entry and entry.conditional_headers())
+    if entry is not None and r.status_code == 304:
+        page_cache.revalidated(key, entry)
+        return parse_status(entry.data)
+    data = r.content.decode('utf-8')
+    rsp = parse_status(data)
+    page_cache.put(
+        key, data, r.headers,
+        newest=rsp[0].submit_id if rsp else None,
+        final=all(st.accepted is not None for st in rsp),
+        start=params.get('from')
+    )
+    return rsp
+
+
+def status_params(kwargs):
+    # query string for status.aspx: one page of 1000 entries in the problem set space
+    kwargs = dict(kwargs)
     kwargs["space"] = 1
     if "from_" in kwargs:
-        kwargs["from"] = kwargs["from_"]
-        del kwargs["from_"]
+        kwargs["from"] = kwargs.pop("from_")
     kwargs['count'] = 1000
-    url = f"https://acm.timus.ru/status.aspx"
-    data = rqs.get(url, params=kwargs).content.decode('utf-8')
+    return kwargs
+
+
+p_status_row = re.compile(
+    r'<TD class="id">(?P<submit_id>.*?)</TD>'
+    r'.*?<TD class="date"><NOBR>(?P<time>.*?)</NOBR><BR><NOBR>(?P<date>.*?)</NOBR></TD>'
+    r'.*?<TD class="coder">.*?id=(?P<author_id>.*?)".*?>(?P<author_name>.*?)</A></TD>'
+    r'.*?<TD class="problem">.*?num=(?P<task_id>.*?)".*?>\. (?P<task_name>.*?)<.*?</TD>'
+    r'.*?<TD class="language">(?P<lang_name>.*?)</TD>'
+    r'.*?<TD class="verdict_(?P<stat>ac|rj|wt)">(?P<reason>.*?)</TD>'
+    r'.*?<TD class="test">(?P<test>.*?)</TD>'
+    r'.*?<TD class="runtime">(?P<runtime>.*?)</TD>'
+    r'.*?<TD class="memory">(?P<memory>.*?)</TD>',
+    re.I
+)
+
+status_tz = timezone(timedelta(hours=5))  # acm.timus.ru prints dates in GMT+0500
+
+status_months = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+)}
+
+
+@functools.lru_cache(maxsize=4096)
+def status_day_timestamp(date):
+    # "18 Oct 2026" -> timestamp of its midnight; status pages repeat the same few days a lot
+    day, month, year = date.split()
+    return datetime(int(year), status_months[month[:3].lower()], int(day), tzinfo=status_tz).timestamp()
+
+
+@metrics.registry.parser("status.aspx")
+def parse_status(data) -> list[SubmitStatus]:
+    # single pass over the status table, every column of a row is captured by one match
     rsp = []
-    p_entry = re.compile(r'(<TD class="id">(.*?)</TD>.*?<TD class="memory">[^>]*?>)', re.I)
-    p_author_id = re.compile(r'<TD class="coder">.*?id=(.*?)".*?</TD>', re.I)
-    p_author_name = re.compile(r'<TD class="coder">.*?>(.*?)</A></TD>', re.I)
-    p_task_id = re.compile(r'<TD class="problem">.*?num=(.*?)".*?</TD>', re.I)
-    p_task_name = re.compile(r'<TD class="problem">.*?>\. (.*?)<.*?</TD>', re.I)
-    p_lang = re.compile(r'<TD class="language">(.*?)</TD>', re.I)
-    p_verdict = re.compile(r'<TD class="verdict_(ac|rj|wt)">(.*?)</TD>', re.I)
-    p_runtime = re.compile(r'<TD class="runtime">(.*?)</TD>', re.I)
-    p_memory = re.compile(r'<TD class="memory">(.*?)</TD>', re.I)
-    p_test = re.compile(r'<TD class="test">(.*?)</TD>', re.I)
-    p_date = re.compile(r'<TD class="date"><NOBR>(.*?)</NOBR><BR><NOBR>(.*?)</NOBR></TD>', re.I)
-
-    for entry, submit_id in p_entry.findall(data):
+    lang_codes = {}
+    for m in p_status_row.finditer(data):
         stat = SubmitStatus()
+        submit_id = m['submit_id']
         try:
             stat.submit_id = int(submit_id)
         except ValueError:
             submit_id = submit_id[:submit_id.rfind("<")]
             submit_id = submit_id[submit_id.rfind(">") + 1:]
             stat.submit_id = int(submit_id)
-        verdict = p_verdict.findall(entry)[0]
-        stat.stat = verdict[0]
-        stat.accepted = None if verdict[0] == "wt" else False if verdict[0] == "rj" else True
-        stat.reason = verdict[1]
+        verdict = sys.intern(m['stat'].lower())
+        stat.stat = verdict
+        stat.accepted = None if verdict == "wt" else False if verdict == "rj" else True
+        stat.reason = sys.intern(m['reason'])
         try:
-            stat.runtime = float(p_runtime.findall(entry)[0])
-        except (IndexError, ValueError):
+            stat.runtime = float(m['runtime'])
+        except ValueError:
             stat.runtime = 0
         try:
-            stat.memory = int(p_memory.findall(entry)[0].replace(" ", "")[:-2])
-        except (IndexError, ValueError):
+            stat.memory = int(m['memory'].replace(" ", "")[:-2])
+        except ValueError:
             stat.memory = 0
         try:
-            stat.test = int(p_test.findall(entry)[0])
-        except (IndexError, ValueError):
+            stat.test = int(m['test'])
+        except ValueError:
             stat.test = 0
-        stat.author_id = p_author_id.findall(entry)[0]
-        stat.author_name = p_author_name.findall(entry)[0]
-        stat.task_id = p_task_id.findall(entry)[0]
-        stat.task_name = p_task_name.findall(entry)[0]
-        stat.lang_name = p_lang.findall(entry)[0]
-        stat.lang_code = detect_lang(stat.lang_name.split()[0])
-        date = p_date.findall(entry)[0]
-        date = date[0] + " " + date[1] + " GMT+0500"
-        date = datetime.strptime(date, "%H:%M:%S %d %b %Y %Z%z")
-        stat.timestamp = date.timestamp()
+        # repeated strings are interned so that large histories share one copy of each
+        stat.author_id = sys.intern(m['author_id'])
+        stat.author_name = sys.intern(m['author_name'])
+        stat.task_id = sys.intern(m['task_id'])
+        stat.task_name = sys.intern(m['task_name'])
+        stat.lang_name = lang_name = sys.intern(m['lang_name'])
+        if lang_name not in lang_codes:
+            lang_codes[lang_name] = detect_lang(lang_name.split()[0])
+        stat.lang_code = lang_codes[lang_name]
+        hours, minutes, seconds = m['time'].split(':')
+        stat.timestamp = status_day_timestamp(m['date']) + int(hours) * 3600 + int(minutes) * 60 + int(seconds)
         rsp.append(stat)
+    return rsp
+
+
+def filter_status(rsp, count=math.inf, upto=None, lang=None) -> list[SubmitStatus]:
     if upto is not None:
         rsp = filter(lambda st: st.submit_id > upto, rsp)
     lang_code = detect_lang(lang)
@@ -176,52 +274,39 @@ def status_naked(count=math.inf, upto=None, lang=None, **kwargs) -> list[SubmitS
 
 def status_cached_iter(cache: Iterable[SubmitStatus], **kwargs):
     # supports author, num, status, lang, count, from, from_, upto
-    cache = iter(cache)
-    if 'author' in kwargs:
-        cache = filter(lambda st: st.author_id == kwargs['author'], cache)
-    if 'num' in kwargs:
-        cache = filter(lambda st: st.task_id == kwargs['num'], cache)
-    if 'status' in kwargs:
-        cache = filter(lambda st: st.accepted == (kwargs['status'] == 'accepted'), cache)
-    if 'lang' in kwargs:
-        lang_code = detect_lang(kwargs['lang'])
-        cache = filter(lambda st: st.lang_code == lang_code, cache)
-    if 'from_' in kwargs:
-        kwargs['from'] = kwargs.pop('from_')
-    if 'from' in kwargs:
-        if isinstance(kwargs['from'], int):
-            cache = filter(lambda st: st.submit_id <= kwargs['from'], cache)
-        else:
-            if isinstance(kwargs['from'], datetime):
-                kwargs['from'] = kwargs['from'].timestamp()
-            cache = filter(lambda st: st.timestamp > kwargs['from'], cache)
-    if 'upto' in kwargs:
-        if isinstance(kwargs['upto'], int):
-            cache = filter(lambda st: st.submit_id > kwargs['upto'], cache)
-        else:
-            if isinstance(kwargs['upto'], datetime):
-                kwargs['upto'] = kwargs['upto'].timestamp()
-            cache = filter(lambda st: st.timestamp > kwargs['upto'], cache)
-    if math.isfinite(kwargs.get('count', math.inf)):
-        yield from itertools.islice(cache, kwargs['count'])
-    yield from cache
+    # the cache may be in any order; Query(cache) stops early on newest-first caches
+    yield from Query(cache, ordered=False).where(**kwargs)
 
 
-def status_cached(cache: Iterable[SubmitStatus], **kwargs):
+def status_cached(cache: Iterable[SubmitStatus], table=False, **kwargs):
+    # table=True collects the result into a columnar StatusTable
+    if table:
+        return StatusTable(status_cached_iter(cache, **kwargs))
     return [*status_cached_iter(cache, **kwargs)]
 
 
-def status_find(value, /, key=None, *, progress=None, **kwargs):
+class FindResult(list):
+    # [lower, upper] submit id bounds; probes is the number of status.aspx requests the search took
+
+    def __init__(self, bounds, probes=0):
+        super().__init__(bounds)
+        self.probes = probes
+
+
+def status_find(value, /, key=None, *, progress=None, **kwargs) -> FindResult:
     # accepts author, num, status, from, upto
     # lang filtering is explicitly can't be supported with binary search
     # when in desperate need, utilize this to pinpoint an approximation; then use external linear search
     # example_key = lambda st: st.timestamp
+    # timestamps (the default key) are searched by interpolation seeded from time_index,
+    # any other key by bisection
 
     if not progress:
         def progress(*_, **__):
             pass
     elif progress is True:
         progress = print
+    interpolate = not key
     if not key:
         def key(st):
             return st.timestamp
@@ -230,24 +315,118 @@ def status_find(value, /, key=None, *, progress=None, **kwargs):
     kwargs.pop('lang', None)    # lang filtering is not supported
     if 'from_' in kwargs:
         kwargs['from'] = kwargs.pop('from_')
+    probes = 0
     if not isinstance(kwargs.get('upto', 1), int):
         _ = None
         if "from" in kwargs:
             _ = kwargs.pop("from")
-        kwargs['upto'] = status_find(kwargs.pop('upto'), key=key, progress=progress, **kwargs)[0]
+        found = status_find(kwargs.pop('upto'), key=None if interpolate else key, progress=progress, **kwargs)
+        kwargs['upto'] = found[0]
+        probes += found.probes
         if _ is not None:
             kwargs["from"] = _
     if not isinstance(kwargs.get('from', 1), int):
         _ = None
         if "upto" in kwargs:
             _ = kwargs.pop("upto")
-        kwargs['from'] = status_find(kwargs.pop('from'), key=key, progress=progress, **kwargs)[1] - 1
+        found = status_find(kwargs.pop('from'), key=None if interpolate else key, progress=progress, **kwargs)
+        kwargs['from'] = found[1] - 1
+        probes += found.probes
         if _ is not None:
             kwargs["upto"] = _
+    if interpolate:
+        rsp = status_interpolate(value, progress=progress, **kwargs)
+    else:
+        rsp = status_bisect(value, key, progress=progress, **kwargs)
+    rsp.probes += probes
+    time_index.save()
+    return rsp
+
+
+def status_interpolate(value, /, *, progress, max_probes=64, margin=500, **kwargs) -> FindResult:
+    # accepts author, num, status, from, upto (submit ids)
+    # secant search for the submit id of a timestamp: each probe is aimed at the interpolated crossing
+    # between the closest known samples below (a) and above (b) the timestamp, plus a margin so
+    # the 1000-row page lands around it; a probe that fails to halve the gap is followed by a bisection step
+    top = kwargs.pop('from', None)
+    lo, hi = time_index.bracket(value)
+    a = lo if lo is not None and lo[0] > kwargs.get('upto', 0) else (kwargs.get('upto', 0), -math.inf)
+    b = hi if hi is not None and (top is None or hi[0] <= top) else None
     interval = [-math.inf, math.inf]
+    probes = 0
+    width0 = width = None
+    bisect_next = False
+
+    def fetch(f):
+        nonlocal a, b, probes
+        probes += 1
+        sel = status_naked(**kwargs) if f is None else status_naked(from_=f, **kwargs)
+        for st in sel:
+            if st.timestamp <= value:
+                interval[0] = max(interval[0], st.submit_id)
+                if st.submit_id > a[0]:
+                    a = (st.submit_id, st.timestamp)
+            if st.timestamp >= value:
+                interval[1] = min(interval[1], st.submit_id)
+                if b is None or st.submit_id < b[0]:
+                    b = (st.submit_id, st.timestamp)
+        return sel
+
+    def aim(floor, ceiling):
+        # next page start within [floor, ceiling], ceiling wins when they cross
+        if bisect_next or not math.isfinite(a[1]) or b[1] <= a[1]:
+            guess = (a[0] + b[0]) // 2
+        else:
+            guess = a[0] + int((value - a[1]) * (b[0] - a[0]) / (b[1] - a[1]))
+        return min(ceiling, max(floor, guess + margin))
+
+    def ceiling():
+        # highest useful page start below the known upper bound, None when only the head is left
+        if math.isfinite(interval[1]):
+            return interval[1] - 1
+        if b is not None and b[0] > floor and (top is None or b[0] <= top):
+            return b[0]
+        return None
+
+    progress(0.0)
+    floor = a[0]
+    f = top if b is None else aim(floor, b[0])
+    while probes < max_probes:
+        sel = fetch(f)
+        below = any(st.timestamp <= value for st in sel)
+        above = any(st.timestamp >= value for st in sel)
+        if below and above:
+            break  # page rows are consecutive, so the crossing is on this page
+        if above:
+            if len(sel) < 1000:
+                break  # reached the oldest entry, nothing is below the timestamp
+            f = aim(floor, sel[-1].submit_id - 1)
+        else:
+            # empty or entirely before the timestamp: nothing in (page top, f], the crossing is above f
+            if f is None or f == top or f >= interval[1] - 1:
+                break
+            floor = f + 1
+            if a[0] < f:
+                a = (f, a[1])
+            f = top if ceiling() is None else aim(floor, ceiling())
+        if b is not None:
+            bisect_next = width is not None and (b[0] - a[0]) * 2 > width
+            width = b[0] - a[0]
+            width0 = width0 or width
+            progress(1 - math.log(max(width, 1)) / math.log(max(width0, 2)) if width0 > 1 else 1.0)
+    progress(1.0)
+    return FindResult(interval, probes)
+
+
+def status_bisect(value, key, /, *, progress, **kwargs) -> FindResult:
+    # accepts author, num, status, from, upto (submit ids); key must be non-decreasing in submit_id
+    interval = [-math.inf, math.inf]
+    probes = 0
 
     # noinspection PyShadowingNames
     def bound(sel: list[SubmitStatus]):
+        nonlocal probes
+        probes += 1
         bounding = [-math.inf, math.inf]
         for st in sel:
             cp = key(st) - value
@@ -265,7 +444,7 @@ def status_find(value, /, key=None, *, progress=None, **kwargs):
     bounding = bound(shot)
     if math.isfinite(sum(bounding)) or not math.isfinite(bounding[1]) or len(shot) in range(1, 1000):
         progress(1.0)
-        return bounding
+        return FindResult(bounding, probes)
     kwargs['from'] = kwargs.get('upto', 0) + 999
     # loop stops when shot contains less than 1000 elements or when shot contains elements greater than upto
     # 1) shot bounding is finite, meaning that the point is found
@@ -283,25 +462,37 @@ def status_find(value, /, key=None, *, progress=None, **kwargs):
         progress(search_width ** (-(interval[1] - end) / search_width))
         kwargs['from'] = (interval[1] + end) // 2 + 500
         kwargs['upto'] = end
-    return interval
+    return FindResult(interval, probes)
 
 
 def status_find_timestamp(timestamp, /, **kwargs):
     return status_find(timestamp, **kwargs)
 
 
-def status_iter(*, lang=None, progress=None, **kwargs):
-    # supports author, num, status, count, from, upto, lang
-    # from and upto can be timestamps or datetime objects
+def status_window(from_, upto, limiter=None, **kwargs):
+    # all entries with upto < submit_id <= from_, newest first
+    # supports author, num, status
+    rsp = []
+    while from_ > upto:
+        if limiter is not None:
+            limiter.wait()
+        chunk = status_naked(from_=from_, upto=upto, **kwargs)
+        rsp += chunk
+        if len(chunk) < 1000:
+            break
+        from_ = chunk[-1].submit_id - 1
+    return rsp
 
-    # valid slice specs:
-    # from (implied: count = <single-request>, upto = 0)
-    # count (implied: from = <newest>, upto = 0)
-    # upto (implied: from = <newest>, count = inf)
-    # from, upto (implied: count = inf)
-    # from, count (implied: upto = 0)
-    # from, count, upto
 
+def status_iter_parallel(*, workers=8, rate=None, window=1000, lang=None, progress=None, **kwargs):
+    # supports author, num, status, count, from, upto, lang; from and upto must be submit ids
+    # splits (upto, from] into windows of `window` submit ids, fetches them concurrently
+    # with at most `rate` requests per second, and yields them back in descending order.
+    # slices filtered by author, num or status are paged through sequentially instead: their rows are sparse,
+    # so windows would cost a request per `window` judge-wide ids rather than one per 1000 matching rows
+    if any(k in kwargs for k in ('author', 'num', 'status')):
+        yield from status_iter(lang=lang, progress=progress, **kwargs)
+        return
     if progress is None:
         def progress(*_, **__):
             pass
@@ -309,57 +500,140 @@ def status_iter(*, lang=None, progress=None, **kwargs):
         progress = print
     if 'from_' in kwargs:
         kwargs['from'] = kwargs.pop('from_')
-    if not isinstance(kwargs.get('from', 0), int):
-        _ = kwargs.pop('upto', 'marker')
-        kwargs['from'] = status_find_timestamp(kwargs.pop('from'), **kwargs)[0]
-        if _ != 'marker':
-            kwargs['upto'] = _
-    if not isinstance(kwargs.get('upto', 0), int):
-        _ = kwargs.pop('from', 'marker')
-        kwargs['upto'] = status_find_timestamp(kwargs.pop('upto'), **kwargs)[1]
-        if _ != 'marker':
-            kwargs['from'] = _
+    start_sid = kwargs.pop('from')
+    end_sid = kwargs.pop('upto')
+    count = kwargs.pop('count', math.inf)
+    kwargs.pop('space', None)
     if lang is not None:
         lang = detect_lang(lang)
-    count = kwargs.pop('count', math.inf if 'upto' in kwargs else None)
-    kwargs['count'] = 1000
-    start_sid = None
-    end_sid = kwargs.get('upto', 0)
-    start_count = count or math.inf
-    current_sid = None
+    limiter = RateLimiter(rate)
+    bounds = iter(range(start_sid, end_sid, -window))
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers)
     progress(0.0)
-    while True:
-        chunk = status_naked(**kwargs)
+    try:
+        # keeps a bounded number of windows in flight so huge ranges don't pile up in memory
+        for hi in itertools.islice(bounds, workers * 2):
+            pending.append(executor.submit(status_window, hi, max(hi - window, end_sid), limiter, **kwargs))
+        while pending and count > 0:
+            chunk = pending.popleft().result()
+            hi = next(bounds, None)
+            if hi is not None:
+                pending.append(executor.submit(status_window, hi, max(hi - window, end_sid), limiter, **kwargs))
+            if lang is not None:
+                chunk = [*filter(lambda st: st.lang_code == lang, chunk)]
+            if math.isfinite(count):
+                del chunk[int(count):]
+            count -= len(chunk)
+            yield from chunk
+            if chunk:
+                progress((start_sid - chunk[-1].submit_id) / (start_sid - end_sid))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    progress(1.0)
+
+
+def status_bounds(kwargs):
+    # resolves the from/upto bounds of a status_iter slice into submit ids, in place:
+    # both become the newest submission at or before the timestamp (from is inclusive, upto exclusive)
+    if 'from_' in kwargs:
+        kwargs['from'] = kwargs.pop('from_')
+    filters = {k: kwargs[k] for k in ('author', 'num', 'status') if k in kwargs}
+    for k in ('from', 'upto'):
+        if not isinstance(kwargs.get(k, 0), int):
+            kwargs[k] = status_find_timestamp(kwargs[k], **filters)[0]
+    return kwargs
+
+
+class StatusPages:
+    # pagination of one status_iter slice with submit id bounds, shared by the blocking and asyncio loops:
+    # fetch status_naked(**pages.params) while not pages.done and yield what pages.take(page) returns
+
+    def __init__(self, lang=None, progress=None, **kwargs):
+        if progress is None:
+            def progress(*_, **__):
+                pass
+        elif progress is True:
+            progress = print
+        self.progress = progress
+        self.lang = None if lang is None else detect_lang(lang)
+        self.count = kwargs.pop('count', math.inf if 'upto' in kwargs else None)
+        kwargs['count'] = 1000
+        self.params = kwargs
+        self.start_sid = None
+        self.end_sid = kwargs.get('upto', 0)
+        self.start_count = self.count or math.inf
+        self.done = False
+        progress(0.0)
+
+    def take(self, chunk: list[SubmitStatus]) -> list[SubmitStatus]:
         if not chunk:
-            break
-        kwargs['from'] = chunk[-1].submit_id - 1
-        if start_sid is None:
-            start_sid = current_sid = chunk[0].submit_id
+            return self.finish([])
+        self.params['from'] = chunk[-1].submit_id - 1
+        if self.start_sid is None:
+            self.start_sid = chunk[0].submit_id
         tail_flag = len(chunk) != 1000
-        if lang is not None:
-            chunk = [*filter(lambda st: st.lang_code == lang, chunk)]
-        if count is None:
-            count = len(chunk)
-        else:
-            del chunk[count:]
-        count -= len(chunk)
-        yield from chunk
-        if tail_flag or count <= 0:
-            break
+        current_sid = chunk[-1].submit_id
+        if self.lang is not None:
+            chunk = [*filter(lambda st: st.lang_code == self.lang, chunk)]
+        if self.count is None:
+            self.count = len(chunk)
+        elif math.isfinite(self.count):
+            del chunk[int(self.count):]
+        self.count -= len(chunk)
+        if tail_flag or self.count <= 0:
+            return self.finish(chunk)
         if chunk:
             current_sid = chunk[-1].submit_id
-        progress(max(1 - count / start_count, (start_sid - current_sid) / (start_sid - end_sid)))
-    progress(1.0)
-    return
+        done = (self.start_sid - current_sid) / (self.start_sid - self.end_sid)
+        if math.isfinite(self.start_count):
+            done = max(done, 1 - self.count / self.start_count)
+        self.progress(done)
+        return chunk
+
+    def finish(self, chunk):
+        self.done = True
+        self.progress(1.0)
+        return chunk
+
 
+def status_iter(*, lang=None, progress=None, workers=None, rate=None, **kwargs):
+    # supports author, num, status, count, from, upto, lang
+    # from and upto can be timestamps or datetime objects
+    # when both from and upto are given and author, num, status aren't,
+    # workers > 1 fetches pages concurrently (see status_iter_parallel)
 
-def status(**kwargs):
+    # valid slice specs:
+    # from (implied: count = <single-request>, upto = 0)
+    # count (implied: from = <newest>, upto = 0)
+    # upto (implied: from = <newest>, count = inf)
+    # from, upto (implied: count = inf)
+    # from, count (implied: upto = 0)
+    # from, count, upto
+
+    status_bounds(kwargs)
+    if workers and workers > 1 and 'from' in kwargs and 'upto' in kwargs:
+        yield from status_iter_parallel(workers=workers, rate=rate, lang=lang, progress=progress, **kwargs)
+        return
+    pages = StatusPages(lang=lang, progress=progress, **kwargs)
+    while not pages.done:
+        yield from pages.take(status_naked(**pages.params))
+
+
+def status(table=False, **kwargs):
+    # table=True collects the result into a columnar StatusTable
+    if table:
+        return StatusTable(status_iter(**kwargs))
     return [*status_iter(**kwargs)]
 
 
 def search(author_name):
-    url = f"https://acm.timus.ru/search.aspx"
-    data = rqs.get(url, params={"Str": author_name}).content.decode('utf-8')
+    data = client.get("search.aspx", params={"Str": author_name}).content.decode('utf-8')
+    return parse_search(data)
+
+
+@metrics.registry.parser("search.aspx")
+def parse_search(data):
     """
     <tr class="content"><td>12667</td><td><div class="flags-img flag-earth" title="I&#39;m a citizen of the Earth!">
     </div></td><td class="name"><a href="https://acm.timus.ru/author.aspx?id=320816">drbright</a></td><td>5710</td>
@@ -373,28 +647,117 @@ def search(author_name):
 
 
 def author(author_id):
-    url = f"https://acm.timus.ru/author.aspx"
-    r = rqs.get(url, params={"id": author_id})  # .content.decode('utf-8')
-    data = r.text
-    p_author = re.compile(r'<h2 class="author_name">(.*?)</h2>', re.I)
-    author_name = p_author.findall(data)
+    r = client.get("author.aspx", params={"id": author_id})  # .content.decode('utf-8')
+    if r.status_code >= 500:  # still failing after the client's retries; not the same as a missing profile
+        raise RuntimeError(r, r.status_code)
+    return parse_author(r.text, author_id)
+
+
+p_author_name = re.compile(r'<h2 class="author_name">(.*?)</h2>', re.I | re.S)
+p_author_motd = re.compile(r'<div class="author_motto">(.*?)</div>', re.I | re.S)
+p_author_locale = re.compile(r'<div class="flags-img flag-([a-z_-]+)"', re.I)
+p_author_stat = re.compile(
+    r'<td class="author_stats_name">(.*?)</td>\s*<td class="author_stats_value">(.*?)</td>', re.I | re.S
+)
+p_author_solved = re.compile(r'<td class="accepted"[^>]*>.*?num=([0-9]+)', re.I)
+p_tag = re.compile(r'<[^>]*>')
+
+author_stat_fields = {  # author_stats_name label -> Author field
+    "rank by solved": "rank_by_solved",
+    "rank by problems": "rank_by_solved",
+    "rank by rating": "rank_by_rating",
+    "rating": "rating",
+}
+
+
+@metrics.registry.parser("author.aspx")
+def parse_author(data, author_id):
+    author_name = p_author_name.findall(data)
     if not author_name:
         return None
     author_name = author_name[0].strip()
     if author_name[0] == '<':
         p_name = re.compile(r'>(.*?)<')
         author_name = p_name.findall(author_name)[0]
-    return Author(id=int(author_id), name=author_name.strip())
+    rsp = Author(id=int(author_id), name=author_name.strip())
+    motd = p_author_motd.findall(data)
+    if motd:
+        rsp.motd = html.unescape(p_tag.sub('', motd[0])).strip()
+    locale = p_author_locale.findall(data)
+    if locale:
+        rsp.locale = locale[0]
+    for label, value in p_author_stat.findall(data):
+        label = html.unescape(p_tag.sub('', label)).strip().lower()
+        for prefix, k in author_stat_fields.items():
+            if label.startswith(prefix) and rsp[k] is None:
+                rsp[k] = html.unescape(p_tag.sub('', value)).strip()
+                break
+    rsp.solved_tasks = sorted({*map(int, p_author_solved.findall(data))})
+    return rsp
+
+
+author_cache: dict[int, tuple[float, Author | None]] = {}
+
+
+def authors(author_ids, workers=8, ttl=3600.0, progress=None, errors=None) -> dict[int, Author | None]:
+    # fetches many profiles concurrently through the shared client, reusing ones fetched within ttl seconds.
+    # a profile that fails to load doesn't stop the others: it is left out of the result
+    # and its exception is stored in `errors` ({author_id: exception}) when given
+    if progress is None:
+        def progress(*_, **__):
+            pass
+    elif progress is True:
+        progress = print
+    author_ids = [*dict.fromkeys(map(int, author_ids))]
+    now = time.time()
+    rsp = {i: author_cache[i][1] for i in author_ids if i in author_cache and now - author_cache[i][0] < ttl}
+    missing = [i for i in author_ids if i not in rsp]
+    progress(0.0)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(author, i): i for i in missing}
+        for n, future in enumerate(as_completed(futures), 1):
+            author_id = futures[future]
+            try:
+                profile = future.result()
+            except Exception as e:
+                if errors is not None:
+                    errors[author_id] = e
+            else:
+                author_cache[author_id] = (time.time(), profile)
+                rsp[author_id] = profile
+            progress(n / len(missing))
+    progress(1.0)
+    return {i: rsp[i] for i in author_ids if i in rsp}
 
 
 def get_status(submit_id):
     return status_naked(count=1, from_=submit_id)[0]
 
 
+detect_lang_cache: dict[str, str | None] = {}  # name -> code of the table in detect_lang_table
+detect_lang_table = None
+
+
 def detect_lang(lang):
+    global detect_lang_table
     if not isinstance(lang, str):
         return None
     langs = supported_langs()
+    if langs is not detect_lang_table:  # the table was refetched or replaced
+        detect_lang_cache.clear()
+        detect_lang_table = langs
+    code = detect_lang_cache.get(lang, detect_lang_cache)
+    if code is not detect_lang_cache:
+        return code
+    code = resolve_lang(lang, langs)
+    if len(lang) <= 64:  # names, not whole sources passed by submit_data
+        if len(detect_lang_cache) >= 4096:
+            detect_lang_cache.clear()
+        detect_lang_cache[lang] = code
+    return code
+
+
+def resolve_lang(lang, langs):
     if lang.lower() in language_detector:
         lang = language_detector[lang.lower()]
     if lang in langs:
@@ -413,23 +776,53 @@ def detect_lang(lang):
 
 
 def detect_task_id(code_or_filename):
+    # the first four-digit number of a file name or of the source's comments,
+    # preferring one the problem catalog knows when it has been fetched
     headpat = re.compile(r"[0-9]{4}")
     if "\n" not in code_or_filename:  # then its a filename
-        try:
-            return headpat.findall(code_or_filename)[0]
-        except IndexError:
-            return
-    comments = re.compile(r"#.*?$", flags=re.M).findall(code_or_filename)
-    comments += re.compile(r'""".*?"""', flags=re.M).findall(code_or_filename)
-    comments += re.compile(r"'''.*?'''", flags=re.M).findall(code_or_filename)
-    numbers = []
-    for comment in comments:
-        numbers += headpat.findall(comment)
-    if numbers:
-        return numbers[0]
-
-
-def submit(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, retry=True):
+        numbers = headpat.findall(code_or_filename)
+    else:
+        comments = re.compile(r"#.*?$", flags=re.M).findall(code_or_filename)
+        comments += re.compile(r'""".*?"""', flags=re.M).findall(code_or_filename)
+        comments += re.compile(r"'''.*?'''", flags=re.M).findall(code_or_filename)
+        numbers = []
+        for comment in comments:
+            numbers += headpat.findall(comment)
+    if not numbers:
+        return None
+    if catalog.available():
+        return next((n for n in numbers if catalog.exists(n) is not False), numbers[0])
+    return numbers[0]
+
+
+def submit(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, retry=True, force=False):
+    # deduplicates by default: a source this judge id already sent for the same task and language
+    # returns that earlier submit id instead of spending a submission and a throttle window on it again.
+    # sent sources are remembered across runs in submit_cache (~/.cache/timus_api/submits.sqlite3);
+    # force=True always submits
+    data = submit_data(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang)
+    key = data_key(data)
+    if not force:
+        known = submit_cache.get(key)
+        if known is not None:
+            return str(known[0])
+    r = client.post(
+        "submit.aspx?space=1",
+        data=data,
+        files=(),
+        allow_redirects=False,
+        retry_if=submit_throttled if retry else None
+    )
+    submit_id = parse_submit(r.headers, r.text)
+    if submit_id is None and retry:
+        raise RuntimeError(r, r.text)
+    if submit_id is not None:
+        submit_cache.put(key, submit_id, data)
+    return submit_id
+
+
+def submit_data(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None):
+    # builds submit.aspx form fields, reading the source and deducing what was omitted
     encoding = encoding or "cp1251"
     if type(code_or_file) is str:
         if os.path.isfile(code_or_file):
@@ -457,6 +850,8 @@ def submit(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None,
             task_id = detect_task_id(code)
             if task_id is None:
                 raise RuntimeError("Can't deduce task_id")
+    if catalog.exists(task_id) is False:  # spares a submit round trip and a throttle window
+        raise RuntimeError(f"Problem {task_id} is not in the problem set")
 
     data = {}
     data.update(submit_form)
@@ -464,38 +859,40 @@ def submit(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None,
     data["ProblemNum"] = str(task_id)
     data["JudgeID"] = judge_id
     data["Source"] = code.encode("cp1251", errors="replace")
-    r = None
-    for i in range(5):
-        r = rqs.post(
-            "https://acm.timus.ru/submit.aspx?space=1",
-            data=data,
-            files=(),
-            allow_redirects=False
-        )
-        if 'X-SubmitID' in r.headers:  # if response contains X-SubmitID, its ok
-            return r.headers['X-SubmitID']
-        # otherwise if response text contains red text, that text is an error description
-        err_p = re.compile(r"<td .*?color:red.*?>(.*?)</td>", re.IGNORECASE)
-        err = err_p.findall(r.text)
-        if not err:
-            raise RuntimeError(r, r.text)
-        err = err[0]
-        # if error is 10 seconds timeout, wait 6 seconds
-        if '10' not in err:
-            raise RuntimeError(err)
-        elif not retry:
-            return
-        time.sleep(6)
-    raise RuntimeError(r, r.text)
-
-
-def submit_sync(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None):
-    submit_id = submit(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang)
-    time.sleep(2)
-    st = get_status(submit_id)
-    while st.accepted is None:
-        time.sleep(1)
-        st = get_status(submit_id)
+    return data
+
+
+def submit_throttled(r):
+    # judge asks to wait 10 seconds between submissions of one judge id
+    if 'X-SubmitID' in r.headers:
+        return False
+    err = re.findall(r"<td .*?color:red.*?>(.*?)</td>", r.text, re.IGNORECASE)
+    return bool(err) and '10' in err[0]
+
+
+def parse_submit(headers, text):
+    # returns submit id, or None when the judge asks to wait before submitting again
+    if 'X-SubmitID' in headers:  # if response contains X-SubmitID, its ok
+        return headers['X-SubmitID']
+    # otherwise if response text contains red text, that text is an error description
+    err_p = re.compile(r"<td .*?color:red.*?>(.*?)</td>", re.IGNORECASE)
+    err = err_p.findall(text)
+    if not err:
+        raise RuntimeError(headers, text)
+    err = err[0]
+    # if error is 10 seconds timeout, caller should wait 6 seconds
+    if '10' not in err:
+        raise RuntimeError(err)
+
+
+def submit_sync(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, force=False, timeout=None):
+    # raises TimeoutError when no verdict arrives within timeout seconds,
+    # or the status poller's error once the judge stays unreachable
+    submit_id = submit(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang, force=force)
+    st = submit_cache.status(submit_id)  # known verdict of an identical earlier submission
+    if st is None:
+        st = watcher.wait(submit_id, timeout)  # concurrent submit_sync calls share one status poller
+        submit_cache.verdict(st)
     return st
 
 
@@ -530,3 +927,21 @@ def print_status(
     finally:
         if close_file:
             file.close()
+
+
+from .store import StatusStore
+from .watch import VerdictWatcher, watcher
+from .batch import Account, AccountPool, SubmitJob, SubmitQueue
+from .catalog import Catalog, Problem, default_path as default_catalog_path
+from .table import StatusTable
+from .stream import StatusEvent, status_stream, status_stream_async
+from .backfill import Backfill, backfill
+from .query import Query
+from .dedup import SubmitCache, data_key, near_duplicates, default_path as default_submits_path
+
+# problem set index, validates task ids before submitting once filled with catalog.refresh()
+catalog = Catalog(default_catalog_path())
+
+# sources already submitted per judge id and their verdicts, lets submit skip identical resubmissions;
+# on by default and kept across runs, SubmitCache() keeps it in memory only
+submit_cache = SubmitCache(default_submits_path())
@@ -9,6 +9,34 @@ timus_api submit <source> [task_id] [judge_id] [lang] [encoding] - submits solut
                       submit "print(sum(map(int, input().split)))" 1000 320816ZW py cp1251
                                                       - everything is specified, string is used as a source
                       submit - 1000 - py cp866        - source is read from stdin
+                      submit task1000.py --force      - submits even if this judge id submitted the same source
+                                                        before (otherwise its earlier verdict is printed; sent
+                                                        sources are remembered in ~/.cache/timus_api)
+timus_api submit-batch <dir|glob> [judge_id[,judge_id...]] [lang] [encoding]
+                                - submits every matching file through whichever judge id can submit soonest,
+                                  pacing each judge id to its rate limit, then prints a summary
+            Examples: submit-batch solutions/
+                      submit-batch "solutions/*.cpp" 320816ZW,123456AB cpp
+                      submit-batch solutions/ --force - resubmits sources that were already submitted too
+timus_api duplicates <dir|glob> [threshold] [encoding]
+                                - lists pairs of files sharing at least threshold (0.8 by default)
+                                  of their code fragments, most similar first
+            Examples: duplicates solutions/
+                      duplicates "solutions/*.cpp" 0.6
+timus_api status [--author ID] [--num TASK] [--status accepted] [--lang LANG] [--from ID|DATE] [--upto ID|DATE]
+                 [--count N] [--format jsonl|csv|parquet] [-o FILE] [--resume] [--workers N]
+                                - streams the judge status table to FILE (stdout by default)
+            Examples: status --author 320816 -o drbright.jsonl
+                      status --num 1000 --from 2024-01-01 --upto 2023-01-01 --format csv -o 1000.csv --resume
+timus_api backfill <db> [--author ID] [--num TASK] [--status accepted] [--from ID|DATE] [--upto ID|DATE]
+                   [--chunk N] [--workers N]
+                                - copies the judge history into the sqlite StatusStore db in parallel chunks;
+                                  progress is checkpointed to <db>.backfill.json, run it again to resume
+            Examples: backfill history.sqlite3 --upto 2020-01-01 --workers 8
+timus_api problems [words...]   - searches problem titles (or ids) in the local problem catalog,
+                                  fetching the problem set first when the catalog is missing or stale
+            Examples: problems a+b
+                      problems 1000
 """
 
 # TODO: testing
@@ -16,33 +44,135 @@ timus_api submit <source> [task_id] [judge_id] [lang] [encoding] - submits solut
 # TODO: add support for cli keys and cli keyword arguments
 
 from . import *
+import argparse
+from .batch import AccountPool, batch_sources, print_summary
+from .dedup import near_duplicates
+from .export import export_status, formats, parse_bound, progress_bar
 
 
 def print_help(*_):
     print(__doc__)
 
 
-def submit(source=None, task_id=None, judge_id=None, lang=None, encoding=None):
+def submit(source=None, task_id=None, judge_id=None, lang=None, encoding=None, force=False):
     if source is None:
         if encoding is None:
             source = sys.stdin.read()
         else:
             source = sys.stdin.buffer.read().decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
     try:
-        st = submit_sync(source, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang)
+        st = submit_sync(source, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang, force=force)
         print_status(st)
     except Exception as e:
         print(repr(e))
 
 
+def submit_batch(pattern=None, judge_ids=None, lang=None, encoding=None, force=False):
+    sources = batch_sources(pattern or ".")
+    if not sources:
+        print(f'ERROR: No files match "{pattern}"')
+        exit(1)
+    pool = AccountPool(judge_ids.split(",") if judge_ids else [default_judge_id])
+    queue = SubmitQueue(pool=pool, force=force)
+    for source in sources:
+        queue.put(source, lang=lang, encoding=encoding)  # each goes to the judge id that gets free first
+    jobs = queue.run(progress=lambda p: print(f'\rSubmitting: {p:.0%}', end='', file=sys.stderr, flush=True))
+    print(file=sys.stderr)
+    print_summary(jobs)
+    for judge_id, stats in pool.stats().items():
+        print(f"{judge_id}: {stats['submitted']} submitted, {stats['accepted']} accepted, "
+              f"{stats['per_minute']:.1f} per minute")
+
+
+def duplicates(pattern=None, threshold=None, encoding=None):
+    sources = batch_sources(pattern or ".")
+    if not sources:
+        print(f'ERROR: No files match "{pattern}"')
+        exit(1)
+    for similarity, a, b in near_duplicates(sources, float(threshold or 0.8), encoding=encoding):
+        print(f"{similarity:.0%}  {a}  {b}")
+
+
+def status_export(*argv):
+    parser = argparse.ArgumentParser(prog="timus_api status")
+    parser.add_argument("--author")
+    parser.add_argument("--num")
+    parser.add_argument("--status")
+    parser.add_argument("--lang")
+    parser.add_argument("--from", dest="from_", metavar="FROM", type=parse_bound)
+    parser.add_argument("--upto", type=parse_bound)
+    parser.add_argument("--count", type=int)
+    parser.add_argument("--format", choices=formats)
+    parser.add_argument("-o", "--output")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--workers", type=int)
+    opts = vars(parser.parse_args([a for a in argv if a is not None]))
+    file, fmt, resume = opts.pop("output"), opts.pop("format"), opts.pop("resume")
+    kwargs = {k: v for k, v in opts.items() if v is not None}
+    try:
+        total = export_status(file, fmt, resume=resume, progress=progress_bar() if file else None, **kwargs)
+        print(f'Exported {total} entries', file=sys.stderr)
+    except Exception as e:
+        print(repr(e))
+        exit(1)
+
+
+def status_backfill(*argv):
+    parser = argparse.ArgumentParser(prog="timus_api backfill")
+    parser.add_argument("db")
+    parser.add_argument("--author")
+    parser.add_argument("--num")
+    parser.add_argument("--status")
+    parser.add_argument("--from", dest="from_", metavar="FROM", type=parse_bound)
+    parser.add_argument("--upto", type=parse_bound, default=0)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    opts = vars(parser.parse_args([a for a in argv if a is not None]))
+    kwargs = {k: v for k, v in opts.items() if v is not None and k != "db"}
+    try:
+        with StatusStore(opts["db"]) as store:
+            total = backfill(store, progress=progress_bar(), **kwargs)
+        print(f'Stored {total} entries', file=sys.stderr)
+    except Exception as e:
+        print(repr(e))
+        exit(1)
+
+
+def problems(*words):
+    try:
+        catalog.ensure(progress=lambda p: print(f'\rFetching problem set: {p:.0%}', end='', file=sys.stderr))
+    except Exception as e:  # offline: search whatever is cached
+        print(f'\rCould not refresh the problem set: {e!r}', file=sys.stderr)
+    else:
+        print(file=sys.stderr)
+    for problem in catalog.search(" ".join(w for w in words if w)):
+        print(f"{problem.id}  {problem.title}  (difficulty {problem.difficulty}, solved by {problem.solved})")
+
+
 args: list[str | None] = sys.argv[1:]
 for i in range(len(args)):
     if args[i] == '-':
         args[i] = None
 if not args or args[0] in ('help', '-h', '--help', '/?'):
     print_help(*args[1:])
-elif args[0] == 'submit':
-    submit(*args[1:])
+    exit(0)
+if lang_table.get(block=False) is None:
+    lang_table.refresh()  # first run: fetch the language table while the command gets going
+force = '--force' in args
+if force:
+    args.remove('--force')
+if args[0] == 'submit':
+    submit(*args[1:], force=force)
+elif args[0] == 'submit-batch':
+    submit_batch(*args[1:], force=force)
+elif args[0] == 'duplicates':
+    duplicates(*args[1:])
+elif args[0] == 'status':
+    status_export(*sys.argv[2:])
+elif args[0] == 'backfill':
+    status_backfill(*sys.argv[2:])
+elif args[0] == 'problems':
+    problems(*args[1:])
 else:
     print(f'ERROR: Unknown command "{args[0]}"')
     exit(1)
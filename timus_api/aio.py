@@ -0,0 +1,198 @@
+import asyncio
+import math
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+import aiohttp
+
+import timus_api
+from . import (
+    StatusPages, data_key, filter_status, parse_author, parse_search, parse_status, parse_submit, status_bounds,
+    status_params, submit_data, submit_throttled
+)
+from .client import idempotent
+from .metrics import endpoint
+
+
+# asyncio counterparts of the blocking timus_api functions, sharing one aiohttp session per event loop.
+# requests take tokens from timus_api.client's rate limiter and follow its retry settings,
+# so blocking and asyncio calls together stay within one request budget
+# requires aiohttp: pip install timus_api[aio]
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+# errors raised before the request reached the server, safe to retry for any method
+connect_errors = (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError)
+
+
+@dataclass(slots=True)
+class Response:
+    # the parts of a response that parsers and Client's retry_if callbacks look at
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+def session() -> aiohttp.ClientSession:
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connect, read = timus_api.client.timeout
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close():
+    global _session, _session_loop
+    if _session is not None:
+        await _session.close()
+        _session = _session_loop = None
+
+
+async def request(method, path, retry_if=None, **kwargs) -> Response:
+    # Client.request for aiohttp: same rate limiter, backoff, 5xx handling and metrics;
+    # like there, a POST is only sent again on retry_if or when the connection couldn't be made
+    client = timus_api.client
+    metrics = client.metrics
+    page = endpoint(path)
+    method = method.upper()
+    for attempt in range(client.retries + 1):
+        waited = client.limiter.reserve()
+        if waited:
+            metrics.inc("timus_rate_limit_wait_seconds_total", page, waited)
+            await asyncio.sleep(waited)
+        if attempt:
+            metrics.inc("timus_retries_total", page)
+        metrics.inc("timus_requests_total", page)
+        delay = client.backoff
+        sleep = "timus_backoff_sleep_seconds_total"
+        start = time.perf_counter()
+        try:
+            async with session().request(method, client.url(path), allow_redirects=False, **kwargs) as r:
+                rsp = Response(r.status, r.headers.copy(), await r.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("timus_request_errors_total", page)
+            if attempt == client.retries or not (method in idempotent or isinstance(e, connect_errors)):
+                raise
+        else:
+            metrics.observe("timus_request_seconds", page, time.perf_counter() - start)
+            metrics.inc("timus_response_bytes_total", page, len(rsp.content))
+            if retry_if is not None and retry_if(rsp):
+                delay = client.throttle_backoff
+                sleep = "timus_throttle_sleep_seconds_total"
+            elif rsp.status_code < 500:
+                return rsp
+            else:
+                metrics.inc("timus_request_errors_total", page)
+                if method not in idempotent:
+                    return rsp
+            if attempt == client.retries:
+                return rsp
+        delay = min(delay * 2 ** attempt, client.max_backoff)
+        metrics.inc(sleep, page, delay)
+        await asyncio.sleep(delay)
+
+
+async def _get(path, params=None) -> str:
+    params = {k: str(v) for k, v in (params or {}).items()}
+    r = await request("GET", path, params=params)
+    if r.status_code >= 500:  # still failing after the retries, don't parse the error page as an empty one
+        raise RuntimeError(r, r.status_code)
+    return r.content.decode('utf-8')
+
+
+async def supported_langs():
+    if timus_api.supported_langs_cache is not None:
+        return timus_api.supported_langs_cache
+    langs = timus_api.lang_table.get(block=False)
+    if langs is None:
+        # concurrent callers join one fetch of the table instead of each requesting submit.aspx
+        langs = await asyncio.to_thread(timus_api.lang_table.get)
+    return langs
+
+
+async def status_naked(count=math.inf, upto=None, lang=None, **kwargs):
+    if count == 0:
+        return []
+    await supported_langs()  # parse_status resolves language codes
+    data = await _get('status.aspx', status_params(kwargs))
+    return filter_status(parse_status(data), count=count, upto=upto, lang=lang)
+
+
+async def status_iter(*, lang=None, progress=None, **kwargs):
+    # same slicing rules as timus_api.status_iter
+    # timestamp bounds are resolved with the blocking status_find in a worker thread
+    await asyncio.to_thread(status_bounds, kwargs)
+    await supported_langs()
+    pages = StatusPages(lang=lang, progress=progress, **kwargs)
+    while not pages.done:
+        for st in pages.take(await status_naked(**pages.params)):
+            yield st
+
+
+async def status(**kwargs):
+    return [st async for st in status_iter(**kwargs)]
+
+
+async def get_status(submit_id):
+    return (await status_naked(count=1, from_=submit_id))[0]
+
+
+async def search(author_name):
+    data = await _get('search.aspx', {"Str": author_name})
+    return parse_search(data)
+
+
+async def author(author_id):
+    data = await _get('author.aspx', {"id": author_id})
+    return parse_author(data, author_id)
+
+
+async def submit(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, retry=True, force=False):
+    # deduplicates through timus_api.submit_cache like the blocking submit; force=True always submits
+    await supported_langs()  # submit_data resolves the language code
+    data = submit_data(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang)
+    key = data_key(data)
+    if not force:
+        known = timus_api.submit_cache.get(key)
+        if known is not None:
+            return str(known[0])
+    # same urlencoded cp1251 body requests produces for the blocking submit
+    r = await request(
+        "POST",
+        "submit.aspx?space=1",
+        data=urlencode(data),
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        retry_if=submit_throttled if retry else None
+    )
+    submit_id = parse_submit(r.headers, r.text)
+    if submit_id is None and retry:
+        raise RuntimeError(r, r.text)
+    if submit_id is not None:
+        timus_api.submit_cache.put(key, submit_id, data)
+    return submit_id
+
+
+async def submit_sync(code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, force=False,
+                      timeout=None):
+    # the verdict comes from the shared VerdictWatcher, which polls every pending submission with one
+    # status request instead of one per submission
+    submit_id = await submit(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang,
+                             force=force)
+    st = timus_api.submit_cache.status(submit_id)  # known verdict of an identical earlier submission
+    if st is None:
+        verdict = asyncio.wrap_future(timus_api.watcher.add(submit_id))
+        st = await asyncio.wait_for(asyncio.shield(verdict), timeout)
+        timus_api.submit_cache.verdict(st)
+    return st
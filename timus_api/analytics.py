@@ -0,0 +1,184 @@
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from . import SubmitStatus, StatusStore, StatusTable
+from .table import encoded, load_numpy
+
+
+@dataclass(slots=True)
+class Stats:
+    count: int = 0
+    accepted: int = 0
+    runtime_min: float = math.inf  # fastest accepted run
+    runtime_sum: float = 0.0  # over accepted runs
+    memory_min: int | None = None  # smallest accepted memory, KB
+    first: float = math.inf  # timestamps of the first and the last submission
+    last: float = -math.inf
+
+    @property
+    def rejected(self):
+        return self.count - self.accepted
+
+    @property
+    def acceptance(self):
+        return self.accepted / self.count if self.count else 0.0
+
+    @property
+    def runtime_avg(self):
+        return self.runtime_sum / self.accepted if self.accepted else None
+
+    def merge(self, count, accepted, runtime_min, runtime_sum, memory_min, first, last):
+        self.count += count
+        self.accepted += accepted
+        self.runtime_min = min(self.runtime_min, runtime_min)
+        self.runtime_sum += runtime_sum
+        if memory_min is not None and math.isfinite(memory_min):
+            self.memory_min = memory_min if self.memory_min is None else min(self.memory_min, memory_min)
+        self.first = min(self.first, first)
+        self.last = max(self.last, last)
+
+
+class Aggregate:
+    # materialized group-by over status rows, e.g. Aggregate('task_id') or Aggregate('author_id', 'timestamp')
+    # groups by any SubmitStatus field; 'timestamp' is bucketed into `bucket` seconds.
+    # fold() only takes rows newer than the last folded submit_id plus rows that were still "wt" before,
+    # so re-folding a whole growing history after every sync only costs the new rows
+
+    def __init__(self, *by, bucket=86400):
+        self.by = by or ('task_id',)
+        self.bucket = bucket
+        self.groups: dict[tuple, Stats] = {}
+        self.watermark = 0
+        self.pending: set[int] = set()
+
+    def key(self, st: SubmitStatus):
+        return tuple(
+            int(st.timestamp // self.bucket * self.bucket) if k == 'timestamp' else st[k] for k in self.by
+        )
+
+    def fold(self, rows: Iterable[SubmitStatus] | StatusTable | StatusStore):
+        if isinstance(rows, StatusStore):
+            return self.sync(rows)
+        if isinstance(rows, StatusTable) and load_numpy() is not None:
+            return self.fold_table(rows)
+        folded = 0
+        watermark = self.watermark
+        for st in rows:
+            if st.submit_id <= self.watermark and st.submit_id not in self.pending:
+                continue
+            watermark = max(watermark, st.submit_id)
+            if st.accepted is None:
+                self.pending.add(st.submit_id)
+                continue
+            self.pending.discard(st.submit_id)
+            accepted = bool(st.accepted)
+            runtime = st.runtime if accepted and st.runtime is not None else math.inf
+            memory = st.memory if accepted else None
+            group = self.groups.get(k := self.key(st))
+            if group is None:
+                group = self.groups[k] = Stats()
+            group.merge(1, accepted, runtime, runtime if accepted and math.isfinite(runtime) else 0.0,
+                        memory, st.timestamp, st.timestamp)
+            folded += 1
+        self.watermark = watermark
+        return folded
+
+    def fold_table(self, table: StatusTable):
+        # vectorized fold: rows are grouped with numpy over the raw column arrays
+        np = load_numpy()
+        cols = {name: np.frombuffer(table.columns[name], dtype=table.columns[name].typecode)
+                for name in ('submit_id', 'timestamp', 'accepted', 'runtime', 'memory')}
+        sid = cols['submit_id']
+        fresh = sid > self.watermark
+        if self.pending:
+            fresh |= np.isin(sid, np.fromiter(self.pending, dtype='q'))
+        if not fresh.any():
+            return 0
+        self.watermark = max(self.watermark, int(sid[fresh].max()))
+        waiting = fresh & (cols['accepted'] < 0)
+        self.pending.difference_update(sid[fresh & ~waiting].tolist())
+        self.pending.update(sid[waiting].tolist())
+        sel = fresh & ~waiting
+        if not sel.any():
+            return 0
+        keys = []
+        for k in self.by:
+            if k == 'timestamp':
+                keys.append((cols['timestamp'][sel] // self.bucket).astype('q'))
+            elif k in encoded:
+                keys.append(np.frombuffer(table.columns[k].codes, dtype='i')[sel].astype('q'))
+            else:
+                keys.append(np.frombuffer(table.columns[k], dtype=table.columns[k].typecode)[sel].astype('q'))
+        uniq, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        accepted = cols['accepted'][sel] == 1
+        runtime = np.where(accepted, cols['runtime'][sel], np.inf)
+        memory = np.where(accepted, cols['memory'][sel], np.inf).astype('d')
+        stamps = cols['timestamp'][sel]
+        n = len(uniq)
+        count = np.bincount(inverse, minlength=n)
+        n_accepted = np.bincount(inverse, weights=accepted, minlength=n)
+        runtime_sum = np.bincount(inverse, weights=np.where(accepted, cols['runtime'][sel], 0.0), minlength=n)
+        runtime_min = np.full(n, np.inf)
+        memory_min = np.full(n, np.inf)
+        first = np.full(n, np.inf)
+        last = np.full(n, -np.inf)
+        np.minimum.at(runtime_min, inverse, runtime)
+        np.minimum.at(memory_min, inverse, memory)
+        np.minimum.at(first, inverse, stamps)
+        np.maximum.at(last, inverse, stamps)
+        for i, row in enumerate(uniq.tolist()):
+            k = tuple(
+                int(v * self.bucket) if name == 'timestamp'
+                else table.columns[name].values[v] if name in encoded
+                else v
+                for name, v in zip(self.by, row)
+            )
+            group = self.groups.get(k)
+            if group is None:
+                group = self.groups[k] = Stats()
+            group.merge(int(count[i]), int(n_accepted[i]), float(runtime_min[i]), float(runtime_sum[i]),
+                        int(memory_min[i]) if math.isfinite(memory_min[i]) else None,
+                        float(first[i]), float(last[i]))
+        return int(sel.sum())
+
+    def sync(self, store: StatusStore):
+        # folds what the store got since the last fold: new rows and resolved "wt" verdicts
+        rows = [*store.status_iter(upto=self.watermark)]
+        rows += filter(None, map(store.get, self.pending - {st.submit_id for st in rows}))
+        return self.fold(rows)
+
+    def __getitem__(self, key):
+        return self.groups[key if isinstance(key, tuple) else (key,)]
+
+    def __len__(self):
+        return len(self.groups)
+
+    def items(self):
+        return self.groups.items()
+
+    def top(self, n=10, key=lambda stats: stats.count, reverse=True):
+        return sorted(self.groups.items(), key=lambda kv: key(kv[1]), reverse=reverse)[:n]
+
+
+def acceptance_by_task(rows) -> dict:
+    agg = Aggregate('task_id')
+    agg.fold(rows)
+    return {k[0]: stats.acceptance for k, stats in agg.items()}
+
+
+def fastest_by_lang(rows) -> dict:
+    agg = Aggregate('lang_code')
+    agg.fold(rows)
+    return {k[0]: stats.runtime_min for k, stats in agg.items() if stats.accepted}
+
+
+def timeline(rows, bucket=86400) -> dict:
+    # accepted submissions per author per time bucket
+    agg = Aggregate('author_id', 'timestamp', bucket=bucket)
+    agg.fold(rows)
+    rsp = {}
+    for (author_id, stamp), stats in sorted(agg.items()):
+        rsp.setdefault(author_id, []).append((stamp, stats.accepted))
+    return rsp
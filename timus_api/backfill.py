@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import RateLimiter, StatusStore, status_bounds, status_naked
+
+
+class Backfill:
+    # copies the judge history with upto < submit_id <= from_ into a StatusStore,
+    # splitting the id range into chunks of `chunk` ids that `workers` threads fetch side by side.
+    # the lowest id fetched so far in every chunk is written to the json `checkpoint` after each page,
+    # so a crashed or interrupted run started again with the same checkpoint continues exactly there.
+    # a failing page is retried `retries` times with exponential backoff before its chunk is given up;
+    # the other chunks carry on and run() raises once they are done.
+    # filters (author, num, status) go to the server; `rate` caps requests per second over all workers
+
+    def __init__(self, store: StatusStore, checkpoint=None, *, from_=None, upto=0, chunk=100_000, workers=4,
+                 retries=5, backoff=2.0, max_backoff=120.0, rate=None, **filters):
+        if checkpoint is None and store.path != ":memory:":
+            checkpoint = store.path + ".backfill.json"
+        self.store = store
+        self.checkpoint = checkpoint
+        self.chunk = chunk
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = RateLimiter(rate, burst=workers) if rate else None
+        self.filters = filters
+        self.lock = threading.Lock()
+        self.from_ = from_
+        self.upto = upto
+        self.cursors: dict[int, int] = {}  # chunk top -> next submit id to fetch in it
+        self.rows = 0
+        self.errors: dict[int, Exception] = {}
+        self.load()
+
+    def state(self):
+        return {
+            "from": self.from_, "upto": self.upto, "chunk": self.chunk, "filters": self.filters,
+            "cursors": self.cursors, "rows": self.rows,
+        }
+
+    def load(self):
+        if self.checkpoint is None or not os.path.isfile(self.checkpoint):
+            return
+        with open(self.checkpoint, "rt", encoding="utf-8") as f:
+            state = json.load(f)
+        mismatch = state["chunk"] != self.chunk or state["filters"] != self.filters
+        for k, value in (("from", self.from_), ("upto", self.upto)):
+            mismatch |= isinstance(value, int) and state[k] != value  # timestamps were resolved into ids
+        if mismatch:
+            raise RuntimeError(f"Checkpoint {self.checkpoint} belongs to a different backfill")
+        self.from_, self.upto = state["from"], state["upto"]
+        self.cursors = {int(k): v for k, v in state["cursors"].items()}
+        self.rows = state["rows"]
+
+    def save(self):
+        if self.checkpoint is None:
+            return
+        with self.lock:
+            tmp = self.checkpoint + ".tmp"
+            with open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(self.state(), f)
+            os.replace(tmp, self.checkpoint)
+
+    def resolve(self):
+        # fixes the range on the first run: from_ defaults to the newest submission,
+        # timestamps become ids the same way status_iter resolves them
+        if self.from_ is None:
+            self.from_ = status_naked(count=1, **self.filters)[0].submit_id
+        bounds = status_bounds({"from": self.from_, "upto": self.upto, **self.filters})
+        self.from_, self.upto = bounds["from"], bounds["upto"]
+        for top in range(self.from_, self.upto, -self.chunk):
+            self.cursors.setdefault(top, top)
+        self.save()
+
+    def remaining(self):
+        return {top: cursor for top, cursor in self.cursors.items() if cursor > max(top - self.chunk, self.upto)}
+
+    def done(self):
+        span = self.from_ - self.upto if self.from_ is not None else 0
+        fetched = sum(top - cursor for top, cursor in self.cursors.items())
+        return fetched / span if span > 0 else 1.0
+
+    def fetch_chunk(self, top):
+        bottom = max(top - self.chunk, self.upto)
+        failures = 0
+        while (cursor := self.cursors[top]) > bottom:
+            if self.limiter is not None:
+                self.limiter.wait()
+            try:
+                page = status_naked(from_=cursor, upto=bottom, **self.filters)
+            except Exception:
+                failures += 1
+                if failures > self.retries:
+                    raise
+                time.sleep(min(self.backoff * 2 ** (failures - 1), self.max_backoff))
+                continue
+            failures = 0
+            if page:
+                self.store.update(page)
+            with self.lock:
+                self.rows += len(page)
+                self.cursors[top] = page[-1].submit_id - 1 if len(page) == 1000 else bottom
+            self.save()
+
+    def run(self, progress=None) -> int:
+        # returns the number of rows stored over all runs of this checkpoint
+        if progress is None:
+            def progress(*_, **__):
+                pass
+        elif progress is True:
+            progress = print
+        if self.from_ is None or not self.cursors:
+            self.resolve()
+        self.errors.clear()
+        progress(self.done())
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = {executor.submit(self.fetch_chunk, top): top for top in sorted(self.remaining(), reverse=True)}
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    self.errors[futures[future]] = future.exception()
+                progress(self.done())
+        if self.errors:
+            raise RuntimeError(f"{len(self.errors)} chunks failed, run again to resume", self.errors)
+        progress(1.0)
+        return self.rows
+
+
+def backfill(store: StatusStore, checkpoint=None, *, progress=None, **kwargs) -> int:
+    # supports from_, upto (ids or timestamps), author, num, status and the Backfill settings
+    return Backfill(store, checkpoint, **kwargs).run(progress=progress)
@@ -0,0 +1,318 @@
+import glob
+import os.path
+import math
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from . import SubmitStatus, language_detector, submit, watcher as default_watcher
+
+
+@dataclass
+class SubmitJob:
+    source: str
+    judge_id: str | None = None
+    task_id: int | None = None
+    lang: str | None = None
+    encoding: str | None = None
+    submit_id: int | None = None
+    error: Exception | None = None
+    verdict: Future | None = None
+    duplicate: bool = False  # the same source was submitted before, its earlier submission stands in
+
+    @property
+    def status(self) -> SubmitStatus | None:
+        if self.verdict is None or not self.verdict.done() or self.verdict.exception() is not None:
+            return None  # failed verdicts end up in error once the queue has run
+        return self.verdict.result()
+
+
+def default_judge():
+    # read on every use: timus_api.default_judge_id may be set after this module is imported
+    from . import default_judge_id
+    return default_judge_id
+
+
+def record_verdict(st):
+    # submit_cache is created after this module is imported
+    from . import submit_cache
+    submit_cache.verdict(st)
+
+
+@dataclass
+class Account:
+    # one judge id: its submit schedule and what it has submitted so far
+    judge_id: str
+    window: float = 10.5
+    last: float = -math.inf  # time.monotonic() of the latest booked submit slot
+    submitted: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    errors: int = 0
+    throttled: int = 0
+    started: float | None = None  # time.monotonic() of the first submission
+    pending: dict[int, Future] = field(default_factory=dict)
+
+    @property
+    def ready_at(self):
+        return self.last + self.window
+
+    @property
+    def throughput(self):
+        # submissions per minute since the first one
+        if self.started is None:
+            return 0.0
+        return self.submitted * 60 / max(time.monotonic() - self.started, self.window)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted, "accepted": self.accepted, "rejected": self.rejected,
+            "pending": len(self.pending), "errors": self.errors, "throttled": self.throttled,
+            "per_minute": self.throughput, "ready_in": max(0.0, self.ready_at - time.monotonic()),
+        }
+
+
+class AccountPool:
+    # many judge ids submitting side by side, each at most once per `window` seconds.
+    # reserve() books the next slot of the account that gets free first, so n accounts submit n times
+    # as often as one; safe to share between threads. verdicts are tracked through a VerdictWatcher
+
+    def __init__(self, judge_ids=(), window=10.5, watcher=None):
+        self.window = window
+        self.watcher = default_watcher if watcher is None else watcher  # an idle watcher is falsy (no pending)
+        self.accounts: dict[str, Account] = {}
+        self.lock = threading.Lock()
+        for judge_id in judge_ids:
+            self.add(judge_id)
+
+    def add(self, judge_id) -> Account:
+        with self.lock:
+            account = self.accounts.get(judge_id)
+            if account is None:
+                account = self.accounts[judge_id] = Account(judge_id, self.window)
+        return account
+
+    def ready_at(self, judge_id=None):
+        # when judge_id, or any account if None, may submit next
+        if judge_id is not None:
+            return self.add(judge_id).ready_at
+        with self.lock:
+            return min((account.ready_at for account in self.accounts.values()), default=-math.inf)
+
+    def reserve(self, judge_id=None) -> Account:
+        # books a submit slot of judge_id, or of whichever account gets free first, and sleeps until it
+        if judge_id is not None:
+            self.add(judge_id)
+        elif not self.accounts:
+            self.add(default_judge())
+        with self.lock:
+            if judge_id is None:
+                account = min(self.accounts.values(), key=lambda a: a.ready_at)
+            else:
+                account = self.accounts[judge_id]
+            at = max(account.ready_at, time.monotonic())
+            account.last = at  # the next caller gets the slot a window later
+        delay = at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return account
+
+    def throttled(self, account: Account):
+        # the judge refused: someone else used the judge id, wait a whole window from now
+        with self.lock:
+            account.throttled += 1
+            account.last = max(account.last, time.monotonic())
+
+    def known(self, job: SubmitJob) -> bool:
+        # points job at an identical earlier submission of its judge id instead of spending a submit slot on it;
+        # a job without a judge id may go through any account of the pool, so any of them counts
+        from . import submit_cache
+        if job.judge_id is not None:
+            judge_ids = [job.judge_id]
+        else:
+            with self.lock:
+                judge_ids = [*self.accounts] or [default_judge()]
+        for judge_id in judge_ids:
+            known = submit_cache.lookup(
+                job.source, encoding=job.encoding, judge_id=judge_id, task_id=job.task_id, lang=job.lang
+            )
+            if known is not None:
+                break
+        else:
+            return False
+        submit_id, st = known
+        job.judge_id = judge_id
+        job.submit_id = submit_id
+        job.duplicate = True
+        if st is None:
+            job.verdict = self.watcher.add(submit_id, callback=record_verdict)
+        else:
+            job.verdict = Future()
+            job.verdict.set_result(st)
+        return True
+
+    def track(self, account: Account, submit_id) -> Future:
+        submit_id = int(submit_id)
+        with self.lock:
+            account.submitted += 1
+            if account.started is None:
+                account.started = time.monotonic()
+            verdict = account.pending[submit_id] = self.watcher.add(submit_id, callback=record_verdict)
+
+        def done(future: Future):
+            with self.lock:
+                account.pending.pop(submit_id, None)
+                if future.cancelled() or future.exception() is not None:
+                    account.errors += 1
+                elif future.result().accepted:
+                    account.accepted += 1
+                else:
+                    account.rejected += 1
+        verdict.add_done_callback(done)
+        return verdict
+
+    def submit(self, code_or_file, encoding=None, judge_id=None, task_id=None, lang=None, attempts=5,
+               force=False) -> SubmitJob:
+        # submits through judge_id, or the account that can submit soonest; the job's verdict is a Future.
+        # a source submitted before gets the earlier submission's verdict unless forced
+        job = SubmitJob(code_or_file, judge_id, task_id, lang, encoding)
+        if not force and self.known(job):
+            return job
+        for _ in range(attempts):
+            account = self.reserve(judge_id)
+            job.judge_id = account.judge_id
+            try:
+                submit_id = submit(
+                    code_or_file, encoding=encoding, judge_id=account.judge_id, task_id=task_id, lang=lang,
+                    retry=False, force=True
+                )
+            except Exception:
+                with self.lock:
+                    account.errors += 1
+                raise
+            if submit_id is not None:
+                job.submit_id = int(submit_id)
+                job.verdict = self.track(account, submit_id)
+                return job
+            self.throttled(account)
+        raise RuntimeError("Judge kept rejecting the submission as too frequent")
+
+    def submit_sync(self, code_or_file, encoding=None, judge_id=None, task_id=None, lang=None,
+                    force=False) -> SubmitStatus:
+        job = self.submit(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang, force=force)
+        return job.verdict.result()
+
+    def stats(self) -> dict[str, dict]:
+        with self.lock:
+            return {judge_id: account.stats() for judge_id, account in self.accounts.items()}
+
+
+class SubmitQueue:
+    # schedules many submissions so that each judge id submits once per `window` seconds,
+    # which is just over the judge's 10 seconds limit; different judge ids don't wait for each other.
+    # jobs put without a judge id go to whichever account of `pool` gets free first.
+    # submitted jobs are handed to a VerdictWatcher
+
+    def __init__(self, window=10.5, watcher=None, pool=None, force=False):
+        self.pool = pool or AccountPool(window=window, watcher=watcher)
+        self.force = force  # submit sources that were already submitted before too
+        self.queues: dict[str | None, deque[SubmitJob]] = {}
+        self.jobs: list[SubmitJob] = []
+
+    def put(self, source, judge_id=None, task_id=None, lang=None, encoding=None) -> SubmitJob:
+        if lang is None and os.path.isfile(source):
+            ext = os.path.splitext(source)[1][1:].lower()
+            lang = ext if ext in language_detector else None
+        if judge_id is None and not self.pool.accounts:
+            judge_id = default_judge()
+        job = SubmitJob(source, judge_id, task_id, lang, encoding)
+        self.queues.setdefault(job.judge_id, deque()).append(job)
+        self.jobs.append(job)
+        return job
+
+    def ready_at(self, judge_id):
+        return self.pool.ready_at(judge_id)
+
+    def step(self):
+        # submits the job of whichever judge id gets free first; returns False when the queue is empty
+        judges = [judge_id for judge_id, q in self.queues.items() if q]
+        if not judges:
+            return False
+        judge_id = min(judges, key=self.ready_at)
+        if not self.force and self.pool.known(self.queues[judge_id][0]):
+            self.queues[judge_id].popleft()
+            return True
+        account = self.pool.reserve(judge_id)
+        job = self.queues[judge_id].popleft()
+        job.judge_id = account.judge_id
+        try:
+            submit_id = submit(
+                job.source, encoding=job.encoding, judge_id=account.judge_id, task_id=job.task_id, lang=job.lang,
+                retry=False, force=True
+            )
+        except Exception as e:
+            job.error = e
+            with self.pool.lock:
+                account.errors += 1
+            return True
+        if submit_id is None:  # throttled anyway, e.g. someone else used the judge id
+            self.pool.throttled(account)
+            self.queues[judge_id].appendleft(job)
+        else:
+            job.submit_id = int(submit_id)
+            job.verdict = self.pool.track(account, submit_id)
+        return True
+
+    def run(self, progress=None):
+        # submits everything queued, then waits for all verdicts
+        if progress is None:
+            def progress(*_, **__):
+                pass
+        elif progress is True:
+            progress = print
+        total = sum(map(len, self.queues.values())) or 1
+        progress(0.0)
+        while self.step():
+            progress(1 - sum(map(len, self.queues.values())) / total)
+        for job in self.jobs:
+            if job.verdict is not None:
+                try:
+                    job.verdict.result()
+                except Exception as e:
+                    job.error = e
+        progress(1.0)
+        return self.jobs
+
+
+def batch_sources(pattern):
+    # directory -> every file in it, otherwise a glob pattern
+    if os.path.isdir(pattern):
+        return sorted(
+            os.path.join(pattern, name) for name in os.listdir(pattern)
+            if os.path.isfile(os.path.join(pattern, name))
+        )
+    return sorted(filter(os.path.isfile, glob.glob(pattern)))
+
+
+def print_summary(jobs: list[SubmitJob], file=sys.stdout):
+    header = ("Source", "Task", "Judge ID", "Submit ID", "Verdict", "Test", "Time", "Memory")
+    rows = []
+    for job in jobs:
+        st = job.status
+        if st is not None:
+            rows.append((
+                job.source, st.task_id, job.judge_id, st.submit_id,
+                f"{st.reason} (resubmission skipped)" if job.duplicate else st.reason, st.test or "",
+                st.runtime, f"{st.memory} KB"
+            ))
+        else:
+            rows.append((job.source, job.task_id or "", job.judge_id, job.submit_id or "", repr(job.error), "", "", ""))
+    rows = [[str(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    for row in [header, *rows]:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip(), file=file)
+    accepted = sum(1 for job in jobs if job.status is not None and job.status.accepted)
+    print(f"Accepted {accepted} of {len(jobs)}", file=file)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+
+@dataclass
+class CachedPage:
+    blob: bytes  # zlib-compressed page
+    expires: float = 0.0  # time.time() deadline, inf for immutable pages
+    validators: dict = field(default_factory=dict)  # ETag / Last-Modified of the cached response
+
+    @property
+    def data(self) -> str:
+        return zlib.decompress(self.blob).decode('utf-8')
+
+    def fresh(self):
+        return time.time() < self.expires
+
+    def conditional_headers(self):
+        headers = {}
+        if 'ETag' in self.validators:
+            headers['If-None-Match'] = self.validators['ETag']
+        if 'Last-Modified' in self.validators:
+            headers['If-Modified-Since'] = self.validators['Last-Modified']
+        return headers
+
+
+class PageCache:
+    # compressed cache of raw status.aspx pages keyed by the normalized query string
+    # a page is immutable once it starts below the newest submit_id seen so far and holds no "wt" verdicts:
+    # newer submissions can't appear on it and its verdicts are final, so it never expires.
+    # any other page (the head of the table, pending verdicts) lives for `ttl` seconds.
+    # entries are kept in memory up to `max_bytes` compressed, least recently used first out,
+    # and also written to `path` when given
+
+    def __init__(self, ttl=0.0, max_bytes=64 << 20, path=None, level=6):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path = path
+        self.level = level
+        self.entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self.size = 0
+        self.newest = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(page, params):
+        return f"{page}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest() + ".z")
+
+    def get(self, key) -> CachedPage | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is None and self.path is not None:
+            try:
+                with open(self._file(key), "rb") as f:
+                    header, blob = f.read().split(b"\n", 1)
+                header = json.loads(header)
+                entry = CachedPage(blob, header["expires"], header["validators"])
+                self._remember(key, entry)
+            except (OSError, ValueError, KeyError):
+                entry = None
+        if entry is not None and entry.fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _remember(self, key, entry: CachedPage):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.blob)
+            self.entries[key] = entry
+            self.size += len(entry.blob)
+            while self.size > self.max_bytes and self.entries:
+                _, old = self.entries.popitem(last=False)
+                self.size -= len(old.blob)
+
+    def put(self, key, data: str, headers=None, newest=None, final=False, start=None):
+        # start: the page's `from` parameter; newest: highest submit_id on the page
+        if newest is not None:
+            self.newest = max(self.newest, newest)
+        immutable = final and start is not None and int(start) <= self.newest
+        expires = math.inf if immutable else time.time() + self.ttl
+        if not immutable and self.ttl <= 0:
+            return
+        validators = {k: headers[k] for k in ('ETag', 'Last-Modified') if headers and k in headers}
+        entry = CachedPage(zlib.compress(data.encode('utf-8'), self.level), expires, validators)
+        self._remember(key, entry)
+        if self.path is not None:
+            header = json.dumps({"expires": expires, "validators": validators}).encode()
+            tmp = self._file(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(header + b"\n" + entry.blob)
+            os.replace(tmp, self._file(key))
+
+    def revalidated(self, key, entry: CachedPage):
+        # 304 Not Modified: keep the body, start a new ttl
+        entry.expires = time.time() + self.ttl
+        self._remember(key, entry)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,216 @@
+import html
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from . import metrics
+from .langs import cache_path
+
+
+schema = """
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    title_lc TEXT,
+    difficulty INTEGER,
+    solved INTEGER,
+    volume INTEGER
+);
+CREATE INDEX IF NOT EXISTS problems_volume ON problems (volume);
+CREATE TABLE IF NOT EXISTS volumes (
+    volume INTEGER PRIMARY KEY,
+    fetched REAL
+);
+"""
+
+p_problem_row = re.compile(r'<TR class="content">(.*?)</TR>', re.I | re.S)
+p_problem_link = re.compile(r'problem\.aspx\?space=1&(?:amp;)?num=([0-9]+)"[^>]*>(.*?)</A>', re.I | re.S)
+p_problem_solved = re.compile(r'ranklist\.aspx\?[^"]*"[^>]*>([0-9]+)</A>', re.I)
+p_problem_cell = re.compile(r'<TD[^>]*>\s*([0-9]+)\s*</TD>', re.I)
+p_volume_link = re.compile(r'problemset\.aspx\?space=1&(?:amp;)?page=([0-9]+)', re.I)
+p_tag = re.compile(r'<[^>]*>')
+
+
+@dataclass(slots=True)
+class Problem:
+    id: int
+    title: str
+    difficulty: int | None = None
+    solved: int | None = None  # authors who solved it
+    volume: int | None = None
+
+
+def volume_of(task_id):
+    # the problem set is split into volumes of 100 problems: 1000-1099 is volume 1
+    return (int(task_id) - 1000) // 100 + 1
+
+
+@metrics.registry.parser("problemset.aspx")
+def parse_problemset(data) -> list[Problem]:
+    rsp = []
+    for row in p_problem_row.findall(data):
+        link = p_problem_link.search(row)
+        if link is None:
+            continue
+        task_id = int(link[1])
+        solved = p_problem_solved.findall(row)
+        cells = [int(v) for v in p_problem_cell.findall(row) if int(v) != task_id]
+        rsp.append(Problem(
+            id=task_id,
+            title=html.unescape(p_tag.sub('', link[2])).strip(),
+            difficulty=cells[-1] if cells else None,
+            solved=int(solved[0]) if solved else None,
+            volume=volume_of(task_id),
+        ))
+    return rsp
+
+
+def parse_volumes(data):
+    return max(map(int, p_volume_link.findall(data)), default=1)
+
+
+class Catalog:
+    # local index of the problem set: id, title, difficulty and solved counts, kept in sqlite at `path`.
+    # refresh() refetches only volumes older than `ttl` plus the last volume, where new problems appear.
+    # the database is opened on first use, so an unused catalog costs nothing
+
+    def __init__(self, path=":memory:", ttl=7 * 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        with self.lock:
+            if self._db is None:
+                if self.path != ":memory:":
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.executescript(schema)
+            return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def available(self):
+        # false while nothing was fetched yet; doesn't create the database file
+        if self._db is None and self.path != ":memory:" and not os.path.isfile(self.path):
+            return False
+        return len(self) > 0
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM problems").fetchone()[0]
+
+    def __iter__(self):
+        return map(self._problem, self.db.execute(
+            "SELECT id, title, difficulty, solved, volume FROM problems ORDER BY id"
+        ).fetchall())
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    @staticmethod
+    def _problem(row):
+        return Problem(*row)
+
+    def get(self, task_id) -> Problem | None:
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return None
+        row = self.db.execute(
+            "SELECT id, title, difficulty, solved, volume FROM problems WHERE id = ?", (task_id,)
+        ).fetchone()
+        return None if row is None else self._problem(row)
+
+    def exists(self, task_id) -> bool | None:
+        # None when the catalog can't tell: nothing fetched yet, or an id past the newest known problem
+        if not self.available():
+            return None
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return False
+        if task_id in self:
+            return True
+        newest = self.db.execute("SELECT MAX(id) FROM problems").fetchone()[0]
+        return False if task_id < newest else None
+
+    def search(self, text, limit=20) -> list[Problem]:
+        # problems whose title contains every word of text (case-insensitive), most solved first;
+        # a number matches the problem id too
+        words = str(text).lower().split()
+        where = " AND ".join(["title_lc LIKE ? ESCAPE '\\'"] * len(words)) or "1"
+        params = ['%' + w.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for w in words]
+        ids = [int(w) for w in words if w.isdigit()]
+        if ids:
+            where = f"({where}) OR id IN ({', '.join('?' * len(ids))})"
+            params += ids
+        rows = self.db.execute(
+            f"SELECT id, title, difficulty, solved, volume FROM problems WHERE {where} "
+            f"ORDER BY solved IS NULL, solved DESC, id LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [*map(self._problem, rows)]
+
+    def update(self, volume, problems):
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO problems VALUES (?, ?, ?, ?, ?, ?)",
+                [(p.id, p.title, p.title.lower(), p.difficulty, p.solved, p.volume) for p in problems]
+            )
+            self.db.execute("INSERT OR REPLACE INTO volumes VALUES (?, ?)", (volume, time.time()))
+
+    def stale_volumes(self, volumes):
+        fetched = dict(self.db.execute("SELECT volume, fetched FROM volumes").fetchall())
+        deadline = time.time() - self.ttl
+        return [v for v in range(1, volumes + 1) if fetched.get(v, 0) < deadline or v == volumes]
+
+    def refresh(self, force=False, workers=4, progress=None) -> int:
+        # fetches stale volumes (all of them when force), returns how many problems were stored
+        from . import client
+        if progress is None:
+            def progress(*_, **__):
+                pass
+        elif progress is True:
+            progress = print
+        progress(0.0)
+        first = client.get("problemset.aspx", params={"space": 1, "page": 1}).content.decode('utf-8')
+        volumes = parse_volumes(first)
+        todo = [*range(1, volumes + 1)] if force else self.stale_volumes(volumes)
+
+        def fetch(volume):
+            if volume == 1:
+                return volume, parse_problemset(first)
+            data = client.get("problemset.aspx", params={"space": 1, "page": volume}).content.decode('utf-8')
+            return volume, parse_problemset(data)
+
+        total = 0
+        with ThreadPoolExecutor(max(1, min(workers, len(todo)))) as executor:
+            for done, (volume, problems) in enumerate(executor.map(fetch, todo), 1):
+                self.update(volume, problems)
+                total += len(problems)
+                progress(done / len(todo))
+        progress(1.0)
+        return total
+
+    def ensure(self, **kwargs):
+        # refreshes when the catalog is empty or has stale volumes, otherwise does nothing
+        if not self.available():
+            return self.refresh(**kwargs)
+        newest = self.db.execute("SELECT MAX(volume) FROM volumes").fetchone()[0] or 0
+        oldest = self.db.execute("SELECT MIN(fetched) FROM volumes").fetchone()[0] or 0
+        if newest == 0 or time.time() - oldest > self.ttl:
+            return self.refresh(**kwargs)
+        return 0
+
+
+def default_path():
+    return cache_path("problems.sqlite3")
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import requests as rqs
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from .metrics import endpoint, registry
+
+
+class RateLimiter:
+    # token bucket: `rate` requests per second on average, bursts of up to `burst`, shared between threads
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.lock = threading.Lock()
+        self.stamp = time.monotonic()
+
+    def reserve(self):
+        # takes a token and returns how long to wait before using it, without sleeping (for asyncio callers)
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def connect_failed(e) -> bool:
+    # the request never reached the server, so sending it again can't duplicate anything
+    if isinstance(e, rqs.ConnectTimeout):
+        return True
+    return isinstance(getattr(e.args[0] if e.args else None, "reason", None), NewConnectionError)
+
+
+# methods that are safe to send twice; a POST that timed out or got a 5xx may have been processed already
+idempotent = {"GET", "HEAD", "OPTIONS"}
+
+
+class Client:
+    # pooled keep-alive session shared by all endpoint functions
+    # retries connection errors and 5xx responses with exponential backoff,
+    # and responses for which retry_if(response) is true (the judge's "10 seconds" throttle).
+    # other methods than GET are only retried on retry_if or when the connection couldn't be made
+    # every attempt, wait and sleep is recorded per endpoint in `metrics` (timus_api.metrics.registry by default)
+
+    def __init__(
+            self,
+            base_url="https://acm.timus.ru",
+            timeout=(5, 30),  # connect, read
+            rate=5.0,
+            burst=5,
+            retries=5,
+            backoff=1.0,
+            throttle_backoff=6.0,
+            max_backoff=30.0,
+            pool_size=16,
+            metrics=None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.throttle_backoff = throttle_backoff
+        self.max_backoff = max_backoff
+        self.metrics = registry if metrics is None else metrics
+        self.session = rqs.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, retry_if=None, **kwargs):
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        page = endpoint(path)
+        metrics = self.metrics
+        for attempt in range(self.retries + 1):
+            waited = self.limiter.wait()
+            if waited:
+                metrics.inc("timus_rate_limit_wait_seconds_total", page, waited)
+            if attempt:
+                metrics.inc("timus_retries_total", page)
+            metrics.inc("timus_requests_total", page)
+            delay = self.backoff
+            sleep = "timus_backoff_sleep_seconds_total"
+            start = time.perf_counter()
+            try:
+                r = self.session.request(method, self.url(path), **kwargs)
+            except (rqs.ConnectionError, rqs.Timeout) as e:
+                metrics.inc("timus_request_errors_total", page)
+                if attempt == self.retries or not (method in idempotent or connect_failed(e)):
+                    raise
+            else:
+                metrics.observe("timus_request_seconds", page, time.perf_counter() - start)
+                metrics.inc("timus_response_bytes_total", page, len(r.content))
+                if retry_if is not None and retry_if(r):
+                    delay = self.throttle_backoff
+                    sleep = "timus_throttle_sleep_seconds_total"
+                elif r.status_code < 500:
+                    return r
+                else:
+                    metrics.inc("timus_request_errors_total", page)
+                    if method not in idempotent:
+                        return r
+                if attempt == self.retries:
+                    return r
+            delay = min(delay * 2 ** attempt, self.max_backoff)
+            metrics.inc(sleep, page, delay)
+            time.sleep(delay)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,216 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+
+from . import SubmitStatus, submit_data
+from .langs import cache_path
+
+
+columns = [f.name for f in fields(SubmitStatus)]
+
+schema = """
+CREATE TABLE IF NOT EXISTS submits (
+    key TEXT PRIMARY KEY,
+    submit_id INTEGER,
+    task_id TEXT,
+    lang TEXT,
+    judge_id TEXT,
+    submitted REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS submits_id ON submits (submit_id);
+"""
+
+p_trailing_space = re.compile(rb"[ \t]+$", re.M)
+p_space = re.compile(rb"\s+")
+
+
+def normalize(source: bytes | str) -> bytes:
+    # line endings, trailing spaces and blank lines around the code don't change what the judge runs
+    if isinstance(source, str):
+        source = source.encode("cp1251", errors="replace")
+    source = source.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return p_trailing_space.sub(b"", source).strip(b"\n")
+
+
+def source_key(source, task_id, lang, judge_id) -> str:
+    # the judge id is part of the key: the same source sent from another account is a new submission
+    # that account gets credit for, not a duplicate
+    key = b"%s\0%s\0%s\0%s" % (str(judge_id).encode(), str(task_id).encode(), str(lang).encode(), normalize(source))
+    return hashlib.sha256(key).hexdigest()
+
+
+def data_key(data) -> str:
+    # key of a submit_data form
+    return source_key(data["Source"], data["ProblemNum"], data["Language"], data["JudgeID"])
+
+
+class SubmitCache:
+    # (normalized source, task_id, lang, judge_id) -> the submission that already sent it and its final verdict,
+    # kept in sqlite at `path`; submit and submit_sync consult it unless forced.
+    # the database is opened on first use. the cache never fails a submission: when it can't be opened
+    # (read-only or missing cache dir) dedup is off for the process, and a failed read or write
+    # (a locked database) reads as a miss or is dropped
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.RLock()
+        self._db = None
+        self.broken = False
+
+    @property
+    def db(self) -> sqlite3.Connection | None:
+        with self.lock:
+            if self._db is None and not self.broken:
+                try:
+                    if self.path != ":memory:":
+                        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._db = sqlite3.connect(self.path, check_same_thread=False)
+                    self._db.executescript(schema)
+                except (OSError, sqlite3.Error):
+                    self.close()
+                    self.broken = True
+            return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def fetchone(self, query, args):
+        if self._db is None and self.path != ":memory:" and not os.path.isfile(self.path):
+            return None
+        db = self.db
+        if db is None:
+            return None
+        try:
+            return db.execute(query, args).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def execute(self, query, args):
+        # the submission this records already went through, losing its entry only costs dedup
+        with self.lock:
+            db = self.db
+            if db is None:
+                return
+            try:
+                with db:
+                    db.execute(query, args)
+            except sqlite3.Error:
+                pass
+
+    def get(self, key) -> tuple[int, SubmitStatus | None] | None:
+        # (submit_id, final status or None while unknown) of an earlier identical submission
+        row = self.fetchone("SELECT submit_id, status FROM submits WHERE key = ?", (key,))
+        if row is None:
+            return None
+        return row[0], None if row[1] is None else SubmitStatus(**json.loads(row[1]))
+
+    def lookup(self, code_or_file, encoding=None, judge_id=None, task_id=None, lang=None):
+        # same as get() for a source as submit would send it, None when it can't be built or wasn't sent.
+        # file objects are left alone: reading one here would leave nothing for submit
+        if not isinstance(code_or_file, str):
+            return None
+        try:
+            data = submit_data(code_or_file, encoding=encoding, judge_id=judge_id, task_id=task_id, lang=lang)
+            return self.get(data_key(data))
+        except Exception:
+            return None
+
+    def put(self, key, submit_id, data=None):
+        self.execute(
+            "INSERT OR REPLACE INTO submits VALUES (?, ?, ?, ?, ?, ?, NULL)",
+            (key, int(submit_id), data and data["ProblemNum"], data and data["Language"],
+             data and data["JudgeID"], time.time())
+        )
+
+    def verdict(self, st: SubmitStatus):
+        # stores a final verdict for every key submitted as st.submit_id
+        if st is None or st.accepted is None:
+            return
+        self.execute(
+            "UPDATE submits SET status = ? WHERE submit_id = ?",
+            (json.dumps({k: st[k] for k in columns}), int(st.submit_id))
+        )
+
+    def status(self, submit_id) -> SubmitStatus | None:
+        # final status recorded for submit_id
+        row = self.fetchone("SELECT status FROM submits WHERE submit_id = ? AND status IS NOT NULL", (int(submit_id),))
+        return None if row is None else SubmitStatus(**json.loads(row[0]))
+
+    def forget(self, key):
+        self.execute("DELETE FROM submits WHERE key = ?", (key,))
+
+    def __len__(self):
+        row = self.fetchone("SELECT COUNT(*) FROM submits", ())
+        return 0 if row is None else row[0]
+
+
+def default_path():
+    return cache_path("submits.sqlite3")
+
+
+def fingerprints(source, k=24, window=8) -> set[int]:
+    # winnowing: crc32 of every k-character gram of the whitespace-free source,
+    # keeping the minimum of each run of `window` grams. shared fingerprints mean shared code fragments
+    # of at least k characters, whatever the formatting around them
+    text = p_space.sub(b"", normalize(source))
+    grams = [*map(zlib.crc32, map(text.__getitem__, map(slice, range(max(1, len(text) - k + 1)), itertools.count(k))))]
+    if len(grams) <= window:
+        return {min(grams)}
+    # minimum of every window: mins of runs of 1, 2, 4... grams, then two overlapping runs cover a window
+    mins, span = grams, 1
+    while span * 2 <= window:
+        mins, span = [*map(min, mins, mins[span:])], span * 2
+    return set(map(min, mins, mins[window - span:]))
+
+
+def file_fingerprints(path, encoding=None) -> set[int]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if encoding is not None:
+        data = data.decode(encoding, errors="replace").encode("cp1251", errors="replace")
+    return fingerprints(data)
+
+
+def near_duplicates(sources, threshold=0.8, encoding=None, max_share=50, workers=None) -> list[tuple[float, str, str]]:
+    # (similarity, a, b) for every pair of files sharing at least `threshold` of the smaller one's fingerprints,
+    # most similar first; only pairs with a common fingerprint are compared, and fingerprints found in more
+    # than `max_share` files (boilerplate such as includes and fast io) are ignored.
+    # large inputs are fingerprinted by `workers` processes (all cpus by default)
+    sources = [*sources]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(sources) >= 256:
+        with ProcessPoolExecutor(workers) as executor:
+            chunk = max(1, len(sources) // (workers * 4))
+            prints = dict(zip(sources, executor.map(file_fingerprints, sources, [encoding] * len(sources),
+                                                    chunksize=chunk)))
+    else:
+        prints = {path: file_fingerprints(path, encoding) for path in sources}
+    index: dict[int, list[str]] = {}
+    for path, fps in prints.items():
+        for fp in fps:
+            index.setdefault(fp, []).append(path)
+    shared: dict[tuple[str, str], int] = {}
+    for paths in index.values():
+        if len(paths) > max_share:
+            continue
+        for i, a in enumerate(paths):
+            for b in paths[i + 1:]:
+                shared[a, b] = shared.get((a, b), 0) + 1
+    rsp = []
+    for (a, b), n in shared.items():
+        similarity = n / min(len(prints[a]), len(prints[b]))
+        if similarity >= threshold:
+            rsp.append((similarity, a, b))
+    rsp.sort(key=lambda t: (-t[0], t[1], t[2]))
+    return rsp
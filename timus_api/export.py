@@ -0,0 +1,161 @@
+import csv
+import json
+import os
+import sys
+from dataclasses import fields
+from datetime import datetime
+
+from . import SubmitStatus, status_iter
+
+columns = [f.name for f in fields(SubmitStatus)]
+formats = ('jsonl', 'csv', 'parquet')
+
+
+def parse_bound(value):
+    # cli from/upto: a submit id, a unix timestamp with a fraction, or an iso date
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+
+def progress_bar(width=40, file=sys.stderr):
+    def progress(p):
+        done = int(p * width)
+        print(f"\r[{'#' * done}{' ' * (width - done)}] {p:.0%}", end="" if p < 1 else "\n", file=file, flush=True)
+    return progress
+
+
+def last_exported(path, fmt):
+    # (rows already written, submit_id of the last one) for resuming an interrupted export
+    if not os.path.isfile(path) or os.path.getsize(path) == 0:
+        return 0, None
+    if fmt == 'parquet':
+        raise RuntimeError("Parquet exports can't be resumed, export to jsonl or csv instead")
+    with open(path, "rb+") as f:
+        # drop a line cut short by the interruption
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(0, end - (1 << 16)))
+        tail = f.read()
+        if not tail.endswith(b"\n"):
+            f.truncate(end - len(tail) + tail.rfind(b"\n") + 1)
+    rows = 0
+    last = None
+    with open(path, "rt", encoding="utf-8", newline="") as f:
+        if fmt == 'csv':
+            f.readline()  # header
+        for line in f:
+            if line.strip():
+                rows += 1
+                last = line
+    if last is None:
+        return 0, None
+    if fmt == 'jsonl':
+        return rows, json.loads(last)['submit_id']
+    return rows, int(next(csv.reader([last]))[columns.index('submit_id')])
+
+
+class JsonlWriter:
+    def __init__(self, file, append):
+        self.file = file
+
+    def write(self, rows):
+        self.file.write("".join(json.dumps(dict(st.items()), ensure_ascii=False) + "\n" for st in rows))
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    def __init__(self, file, append):
+        self.file = file
+        self.writer = csv.writer(file)
+        if not append:
+            self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(st.values() for st in rows)
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    # requires pyarrow: pip install timus_api[arrow]
+
+    def __init__(self, file, append):
+        import pyarrow.parquet
+        self.pq = pyarrow.parquet
+        self.file = file
+        self.writer = None
+
+    def write(self, rows):
+        from .table import StatusTable
+        table = StatusTable(rows).to_arrow()
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.file, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+writers = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+def export_status(file=None, fmt=None, *, resume=False, chunk=1000, progress=None, **kwargs):
+    # streams status_iter rows to file (path or file object, stdout when None) in chunks of `chunk` rows,
+    # so memory stays constant however long the history is
+    # supports everything status_iter does; resume=True continues below the last exported submit_id
+    if fmt is None:
+        ext = os.path.splitext(file)[1][1:].lower() if isinstance(file, str) else ''
+        fmt = ext if ext in formats else 'jsonl'
+    if fmt not in formats:
+        raise RuntimeError(f"Unknown export format {fmt}")
+    if 'count' not in kwargs:
+        kwargs.setdefault('upto', 0)  # whole history unless bounded
+    append = False
+    if resume and isinstance(file, str):
+        done, last = last_exported(file, fmt)
+        if last is not None:
+            append = True
+            kwargs.pop('from_', None)
+            kwargs['from'] = last - 1
+            if 'count' in kwargs:
+                kwargs['count'] -= done
+                if kwargs['count'] <= 0:
+                    return 0
+    close_file = isinstance(file, str)
+    if file is None:
+        file = sys.stdout.buffer if fmt == 'parquet' else sys.stdout
+    elif close_file:
+        file = open(file, ("a" if append else "w") + ("b" if fmt == 'parquet' else "t"),
+                    **({} if fmt == 'parquet' else {"encoding": "utf-8", "newline": ""}))
+    writer = writers[fmt](file, append)
+    total = 0
+    try:
+        rows = []
+        for st in status_iter(progress=progress, **kwargs):
+            rows.append(st)
+            if len(rows) >= chunk:
+                writer.write(rows)
+                total += len(rows)
+                rows.clear()
+        if rows:
+            writer.write(rows)
+            total += len(rows)
+    finally:
+        writer.close()
+        if close_file:
+            file.close()
+    return total
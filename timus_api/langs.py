@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+
+def cache_path(name):
+    # per-user cache file of timus_api, honours XDG_CACHE_HOME
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "timus_api", name)
+
+
+def default_path():
+    return cache_path("langs.json")
+
+
+class LangTable:
+    # submit.aspx language table {name: code}, kept in memory and in a json file at `path`.
+    # a copy older than `ttl` seconds is still returned right away while a background thread refetches it,
+    # so only the very first run (no file yet) waits for the judge
+
+    def __init__(self, path=None, ttl=7 * 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self.langs: dict[str, str] | None = None
+        self.fetched = 0.0
+        self.refreshing = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, "rt", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.langs, self.fetched = dict(saved["langs"]), float(saved["fetched"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return self.langs
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wt", encoding="utf-8") as f:
+                json.dump({"fetched": self.fetched, "langs": self.langs}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only cache dir only costs a fetch per process
+
+    def update(self, langs):
+        self.langs = langs
+        self.fetched = time.time()
+        self.save()
+        return langs
+
+    def fetch(self):
+        from . import client, parse_langs
+        return self.update(parse_langs(client.get('submit.aspx').text))
+
+    def stale(self):
+        return time.time() - self.fetched > self.ttl
+
+    def get(self, block=True) -> dict[str, str] | None:
+        # block=False returns None instead of fetching when there is no copy at all
+        langs = self.langs
+        refreshing = self.refreshing
+        if langs is None and block and refreshing is not None:
+            refreshing.join()  # a fetch is already on its way
+            langs = self.langs
+        if langs is None:
+            with self.lock:
+                langs = self.langs or self.load()
+                if langs is None:
+                    return self.fetch() if block else None
+        if self.stale():
+            self.refresh()
+        return langs
+
+    def refresh(self):
+        # refetch in a daemon thread, at most one at a time; the old table is served meanwhile
+        with self.lock:
+            if self.refreshing is not None:
+                return
+            self.refreshing = threading.Thread(target=self._refresh, name="timus-langs", daemon=True)
+            self.refreshing.start()
+
+    def _refresh(self):
+        try:
+            self.fetch()
+        except Exception:
+            self.fetched = time.time() - self.ttl + 60  # judge unreachable, retry in a minute
+        finally:
+            self.refreshing = None
@@ -0,0 +1,157 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# latency buckets in seconds, shared by every histogram
+default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (prometheus type, help); every metric is labelled by endpoint (the page: status.aspx, submit.aspx, ...)
+descriptions = {
+    "timus_requests_total": ("counter", "HTTP requests sent, retries included"),
+    "timus_request_errors_total": ("counter", "requests that failed to connect, timed out or got a 5xx"),
+    "timus_request_seconds": ("histogram", "HTTP round trip time"),
+    "timus_response_bytes_total": ("counter", "response body bytes received"),
+    "timus_retries_total": ("counter", "requests repeated after an error or a throttle response"),
+    "timus_throttle_sleep_seconds_total": ("counter", "time slept waiting out the judge's submit throttle"),
+    "timus_backoff_sleep_seconds_total": ("counter", "time slept backing off after errors"),
+    "timus_rate_limit_wait_seconds_total": ("counter", "time spent waiting for the client's rate limiter"),
+    "timus_parse_seconds": ("histogram", "time spent parsing response pages"),
+    "timus_rows_parsed_total": ("counter", "rows or entries extracted from response pages"),
+}
+
+
+class Histogram:
+    def __init__(self, buckets=default_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for le, n in zip((*self.buckets, float("inf")), self.counts):
+            total += n
+            yield le, total
+
+
+class Metrics:
+    # per-endpoint counters and histograms filled in by Client and the page parsers.
+    # hooks are called as hook(name, endpoint, value) on every observation, from the thread that made it;
+    # read the totals with snapshot() or prometheus(), or turn collection off with enabled = False
+
+    def __init__(self, buckets=default_buckets):
+        self.buckets = buckets
+        self.enabled = True
+        self.counters: dict[tuple[str, str], float] = {}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.hooks = []
+        self.lock = threading.Lock()
+
+    def inc(self, name, endpoint, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name, endpoint] = self.counters.get((name, endpoint), 0) + value
+        for hook in self.hooks:
+            hook(name, endpoint, value)
+
+    def observe(self, name, endpoint, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get((name, endpoint))
+            if histogram is None:
+                histogram = self.histograms[name, endpoint] = Histogram(self.buckets)
+            histogram.observe(value)
+        for hook in self.hooks:
+            hook(name, endpoint, value)
+
+    @contextmanager
+    def timer(self, name, endpoint):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, endpoint, time.perf_counter() - start)
+
+    def parser(self, endpoint):
+        # decorator for parse functions: times them and counts what they return
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                rsp = fn(*args, **kwargs)
+                self.observe("timus_parse_seconds", endpoint, time.perf_counter() - start)
+                rows = len(rsp) if isinstance(rsp, (list, dict)) else int(rsp is not None)
+                self.inc("timus_rows_parsed_total", endpoint, rows)
+                return rsp
+            return wrapper
+        return decorator
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def snapshot(self) -> dict:
+        # {name: {endpoint: value}}; histograms become {"count", "sum", "buckets": {le: cumulative count}}
+        rsp = {}
+        with self.lock:
+            for (name, endpoint), value in self.counters.items():
+                rsp.setdefault(name, {})[endpoint] = value
+            for (name, endpoint), histogram in self.histograms.items():
+                rsp.setdefault(name, {})[endpoint] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative()),
+                }
+        return rsp
+
+    def prometheus(self) -> str:
+        # text exposition format, ready to be served on /metrics
+        lines = []
+        with self.lock:
+            for name, (kind, help_) in descriptions.items():
+                if kind == "counter":
+                    samples = [(e, v) for (n, e), v in self.counters.items() if n == name]
+                else:
+                    samples = [(e, h) for (n, e), h in self.histograms.items() if n == name]
+                if not samples:
+                    continue
+                lines.append(f"# HELP {name} {help_}")
+                lines.append(f"# TYPE {name} {kind}")
+                for endpoint, value in sorted(samples, key=lambda s: s[0]):
+                    label = f'endpoint="{endpoint}"'
+                    if kind == "counter":
+                        lines.append(f"{name}{{{label}}} {value:g}")
+                        continue
+                    for le, n in value.cumulative():
+                        le = "+Inf" if le == float("inf") else f"{le:g}"
+                        lines.append(f'{name}_bucket{{{label},le="{le}"}} {n}')
+                    lines.append(f"{name}_sum{{{label}}} {value.sum:g}")
+                    lines.append(f"{name}_count{{{label}}} {value.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def endpoint(path):
+    # "status.aspx", "submit.aspx", ... out of a path or url with its query string
+    return path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1].lower()
+
+
+registry = Metrics()
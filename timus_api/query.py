@@ -0,0 +1,134 @@
+import math
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+
+from . import SubmitStatus, StatusStore, StatusTable, detect_lang
+
+
+class Query:
+    # lazy, composable filter over a status cache, e.g.
+    #     Query(history).author(320816).task(1000).since(datetime(2024, 1, 1)).limit(10)
+    # every method returns a new Query, nothing is read before iterating.
+    # StatusStore and StatusTable get the whole query pushed down to them. any other iterable is assumed
+    # to be newest first, like status, status_iter and stores return it (pass ordered=False otherwise):
+    # iteration then starts at the until() bound (by bisection for sequences) and stops once it
+    # crosses the since() bound or the limit, touching only the rows it needs.
+    # bounds follow status_iter: until (`from`) is inclusive, since (`upto`) exclusive; ids or timestamps
+
+    def __init__(self, cache: Iterable[SubmitStatus] | StatusStore | StatusTable, ordered=True, **kwargs):
+        self.cache = cache
+        self.ordered = ordered
+        self.kwargs = kwargs
+
+    def where(self, **kwargs) -> 'Query':
+        # supports author, num, status, lang, count, from, from_, upto like status_cached_iter
+        if 'from_' in kwargs:
+            kwargs['from'] = kwargs.pop('from_')
+        return Query(self.cache, self.ordered, **{**self.kwargs, **kwargs})
+
+    def author(self, author_id) -> 'Query':
+        return self.where(author=author_id)
+
+    def task(self, task_id) -> 'Query':
+        return self.where(num=task_id)
+
+    def status(self, status) -> 'Query':
+        return self.where(status=status)
+
+    def accepted(self) -> 'Query':
+        return self.where(status='accepted')
+
+    def lang(self, lang) -> 'Query':
+        return self.where(lang=lang)
+
+    def since(self, bound) -> 'Query':
+        return self.where(upto=bound)
+
+    def until(self, bound) -> 'Query':
+        return self.where(**{'from': bound})
+
+    def limit(self, count) -> 'Query':
+        return self.where(count=count)
+
+    def __iter__(self):
+        kwargs = dict(self.kwargs)
+        if isinstance(self.cache, (StatusStore, StatusTable)):
+            return self.cache.status_iter(**kwargs)
+        return self._scan(kwargs)
+
+    def _scan(self, kwargs):
+        count = kwargs.get('count', math.inf)
+        if count <= 0:
+            return
+        predicates = []
+        if 'author' in kwargs:
+            author = str(kwargs['author'])
+            predicates.append(lambda st: st.author_id == author)
+        if 'num' in kwargs:
+            num = str(kwargs['num'])
+            predicates.append(lambda st: st.task_id == num)
+        if 'status' in kwargs:
+            accepted = kwargs['status'] == 'accepted'
+            predicates.append(lambda st: st.accepted == accepted)
+        if 'lang' in kwargs:
+            lang_code = detect_lang(kwargs['lang'])
+            predicates.append(lambda st: st.lang_code == lang_code)
+        top, top_key = bound(kwargs.get('from'))
+        bottom, bottom_key = bound(kwargs.get('upto'))
+        rows = self.cache
+        if self.ordered and top_key == 'submit_id' and isinstance(rows, Sequence):
+            # ids descend: skip everything above the upper bound without looking at it
+            lo, hi = 0, len(rows)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if rows[mid].submit_id > top:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            rows = map(rows.__getitem__, range(lo, len(rows)))
+        n = 0
+        for st in rows:
+            if top is not None and st[top_key] > top:
+                continue
+            if bottom is not None and st[bottom_key] <= bottom:
+                if self.ordered:
+                    return  # everything further down is below the bound too
+                continue
+            if all(p(st) for p in predicates):
+                yield st
+                n += 1
+                if n >= count:
+                    return
+
+    def first(self) -> SubmitStatus | None:
+        return next(iter(self.limit(1)), None)
+
+    def page(self, size, cursor=None) -> tuple[list[SubmitStatus], int | None]:
+        # one page of up to `size` rows below the cursor (None for the newest) and the cursor of the next page,
+        # None when this was the last one; cursors are plain submit ids, safe to hand out and pass back later
+        query = self
+        if cursor is not None:
+            top = self.kwargs.get('from')
+            query = self.where(**{'from': min(cursor, top) if isinstance(top, int) else cursor})
+        rows = [*query.limit(size)]
+        return rows, rows[-1].submit_id - 1 if len(rows) == size else None
+
+    def pages(self, size):
+        cursor = None
+        while True:
+            rows, cursor = self.page(size, cursor)
+            if rows:
+                yield rows
+            if cursor is None:
+                return
+
+
+def bound(value):
+    # (value, the SubmitStatus field it bounds): ints are submit ids, anything else a timestamp
+    if value is None:
+        return None, None
+    if isinstance(value, int):
+        return value, 'submit_id'
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return value, 'timestamp'
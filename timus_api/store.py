@@ -0,0 +1,204 @@
+import math
+import sqlite3
+import threading
+from dataclasses import fields
+from datetime import datetime
+
+from . import SubmitStatus, detect_lang, status_iter
+
+
+columns = [f.name for f in fields(SubmitStatus)]
+
+schema = """
+CREATE TABLE IF NOT EXISTS status (
+    submit_id INTEGER PRIMARY KEY,
+    timestamp REAL,
+    accepted INTEGER,
+    reason TEXT,
+    test INTEGER,
+    runtime REAL,
+    memory INTEGER,
+    author_id INTEGER,
+    author_name TEXT,
+    task_id INTEGER,
+    task_name TEXT,
+    lang_name TEXT,
+    lang_code INTEGER,
+    stat TEXT
+);
+CREATE INDEX IF NOT EXISTS status_author ON status (author_id);
+CREATE INDEX IF NOT EXISTS status_task ON status (task_id);
+CREATE INDEX IF NOT EXISTS status_lang ON status (lang_code);
+CREATE INDEX IF NOT EXISTS status_timestamp ON status (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _row(st: SubmitStatus):
+    row = [st[k] for k in columns]
+    for k in ('author_id', 'task_id', 'lang_code'):
+        i = columns.index(k)
+        row[i] = _int(row[i])
+    return row
+
+
+def _status(row):
+    # ids are stored as INTEGER for the indexes, but rows read back carry them as str like parsed pages do
+    st = SubmitStatus(*row)
+    if st.accepted is not None:
+        st.accepted = bool(st.accepted)
+    for k in ('author_id', 'task_id', 'lang_code'):
+        if st[k] is not None:
+            st[k] = str(st[k])
+    return st
+
+
+class StatusStore:
+    # sqlite-backed mirror of status.aspx rows, iterates newest first like status_iter
+    # can be passed anywhere an Iterable[SubmitStatus] cache is accepted
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(schema)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM status").fetchone()[0]
+
+    def __contains__(self, submit_id):
+        return self.get(submit_id) is not None
+
+    def __iter__(self):
+        return self.status_iter()
+
+    def get(self, submit_id):
+        row = self.db.execute(
+            f"SELECT {', '.join(columns)} FROM status WHERE submit_id = ?", (int(submit_id),)
+        ).fetchone()
+        return None if row is None else _status(row)
+
+    def max_submit_id(self):
+        return self.db.execute("SELECT MAX(submit_id) FROM status").fetchone()[0]
+
+    def update(self, rows):
+        # inserts new rows and overwrites known ones (e.g. "wt" verdicts that got resolved)
+        with self.lock, self.db:
+            cur = self.db.executemany(
+                f"INSERT OR REPLACE INTO status VALUES ({', '.join('?' * len(columns))})",
+                map(_row, rows)
+            )
+        return cur.rowcount
+
+    def query(self, select=None, where=(), **kwargs):
+        # translates status_cached_iter keyword arguments into an sql WHERE clause
+        # supports author, num, status, lang, count, from, from_, upto
+        where, params = [*where], []
+        if 'author' in kwargs:
+            where.append("author_id = ?")
+            params.append(_int(kwargs['author']))
+        if 'num' in kwargs:
+            where.append("task_id = ?")
+            params.append(_int(kwargs['num']))
+        if 'status' in kwargs:
+            where.append("accepted = ?")
+            params.append(int(kwargs['status'] == 'accepted'))
+        if 'lang' in kwargs:
+            where.append("lang_code = ?")
+            params.append(_int(detect_lang(kwargs['lang'])))
+        if 'from_' in kwargs:
+            kwargs['from'] = kwargs.pop('from_')
+        if 'from' in kwargs:
+            value = kwargs['from']
+            if isinstance(value, int):
+                where.append("submit_id <= ?")
+            else:
+                if isinstance(value, datetime):
+                    value = value.timestamp()
+                where.append("timestamp <= ?")
+            params.append(value)
+        if 'upto' in kwargs:
+            value = kwargs['upto']
+            if isinstance(value, int):
+                where.append("submit_id > ?")
+            else:
+                if isinstance(value, datetime):
+                    value = value.timestamp()
+                where.append("timestamp > ?")
+            params.append(value)
+        sql = f"SELECT {select or ', '.join(columns)} FROM status"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY submit_id DESC"
+        if math.isfinite(kwargs.get('count', math.inf)):
+            sql += " LIMIT ?"
+            params.append(int(kwargs['count']))
+        return sql, params
+
+    def status_iter(self, **kwargs):
+        sql, params = self.query(**kwargs)
+        for row in self.db.execute(sql, params):
+            yield _status(row)
+
+    def status(self, **kwargs):
+        return [*self.status_iter(**kwargs)]
+
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def pending(self, **kwargs):
+        # submit ids still waiting for a verdict
+        sql, params = self.query(select="submit_id", where=["accepted IS NULL"], **kwargs)
+        return [row[0] for row in self.db.execute(sql, params)]
+
+    def sync(self, *, progress=None, batch=1000, **kwargs):
+        # supports author, num, status, lang, upto
+        # fetches only submissions newer than the last synced submit_id of the same query,
+        # extending the range down just far enough to re-poll the still pending "wt" verdicts
+        filters = {k: kwargs[k] for k in ('author', 'num', 'status', 'lang') if k in kwargs}
+        key = "sync:" + "&".join(f"{k}={v}" for k, v in sorted(filters.items()))
+        last = self.meta(key)
+        upto = kwargs.get('upto', 0) if last is None else last
+        pending = self.pending(**filters)
+        if pending:
+            upto = min(upto, min(pending) - 1)
+        highest = last or 0
+        total = 0
+        chunk = []
+        for st in status_iter(upto=upto, progress=progress, **filters):
+            highest = max(highest, st.submit_id)
+            chunk.append(st)
+            if len(chunk) >= batch:
+                total += self.update(chunk)
+                chunk.clear()
+        if chunk:
+            total += self.update(chunk)
+        self.set_meta(key, highest)
+        return total
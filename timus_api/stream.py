@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from . import SubmitStatus, status_iter, status_naked
+
+
+@dataclass(slots=True)
+class StatusEvent:
+    # kind is "new" for a submission seen for the first time, "verdict" when a "wt" entry got its verdict,
+    # "error" when a poll failed (status is None then; the feed keeps polling and catches up once it recovers)
+    kind: str
+    status: SubmitStatus | None
+    previous: SubmitStatus | None = None
+    error: Exception | None = None
+
+
+class Subscription:
+    # blocking consumer: iterate to receive events, close() to unsubscribe
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.queue = queue.Queue()
+
+    def deliver(self, event):
+        self.queue.put(event)
+
+    def close(self):
+        self.feed.unsubscribe(self)
+        self.queue.put(None)
+
+    def __iter__(self):
+        while (event := self.queue.get()) is not None:
+            yield event
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class AsyncSubscription(Subscription):
+    # asyncio consumer: async iterate to receive events; bound to the loop it was created in
+
+    def __init__(self, feed):
+        import asyncio  # only async consumers pay for importing it
+        super().__init__(feed)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:  # the loop is closed, nothing can consume the events anymore
+            self.feed.unsubscribe(self)
+
+    def close(self):
+        self.feed.unsubscribe(self)
+        self.deliver(None)
+
+    async def __aiter__(self):
+        while (event := await self.queue.get()) is not None:
+            yield event
+
+
+class CallbackSubscription(Subscription):
+    def __init__(self, feed, callback):
+        super().__init__(feed)
+        self.callback = callback
+
+    def deliver(self, event):
+        self.callback(event)
+
+
+class StatusFeed:
+    # polls the head of status.aspx once for all of its subscribers.
+    # each poll fetches only entries above the newest one already seen, extended down to the
+    # oldest entry still waiting for a verdict; the interval grows by `backoff` up to
+    # `max_interval` while nothing changes and drops back to `interval` on any event.
+    # the poller stops with the last subscriber and forgets what it saw, the next one starts a fresh baseline.
+    # filters (author, num, status) go to the server in the query string
+
+    def __init__(self, interval=2.0, max_interval=30.0, backoff=1.5, **filters):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.filters = filters
+        self.subscribers: list[Subscription] = []
+        self.newest = None
+        self.pending: dict[int, SubmitStatus] = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.requests = 0
+
+    def subscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscribers.append(subscription)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="timus-status-feed", daemon=True)
+                self.thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def emit(self, event):
+        with self.lock:
+            subscribers = [*self.subscribers]
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except Exception:
+                pass  # a failing callback must not stop the poller or starve the other subscribers
+
+    def poll(self):
+        # returns the number of events emitted
+        self.requests += 1
+        if self.newest is None:  # first poll only sets the baseline
+            rows = status_naked(**self.filters)
+            self.newest = rows[0].submit_id if rows else 0
+            self.pending = {st.submit_id: st for st in rows if st.accepted is None}
+            return 0
+        upto = min(self.newest, min(self.pending, default=self.newest + 1) - 1)
+        events = []
+        for st in status_iter(upto=upto, **self.filters):
+            if st.submit_id > self.newest:
+                events.append(StatusEvent("new", st))
+                if st.accepted is None:
+                    self.pending[st.submit_id] = st
+            elif st.submit_id in self.pending and st.accepted is not None:
+                events.append(StatusEvent("verdict", st, self.pending.pop(st.submit_id)))
+        for event in reversed(events):  # oldest first
+            if event.kind == "new":
+                self.newest = max(self.newest, event.status.submit_id)
+            self.emit(event)
+        return len(events)
+
+    def reset(self):
+        # called under self.lock as the poller ends, so that the next subscribe starts a new one.
+        # nothing was watched meanwhile: forget what was seen instead of replaying the gap as new later
+        self.thread = None
+        self.newest = None
+        self.pending = {}
+
+    def run(self):
+        interval = self.interval
+        try:
+            while True:
+                with self.lock:
+                    if not self.subscribers:
+                        self.reset()
+                        return
+                try:
+                    emitted = self.poll()
+                except Exception as e:
+                    emitted = 0
+                    self.emit(StatusEvent("error", None, error=e))
+                interval = self.interval if emitted else min(interval * self.backoff, self.max_interval)
+                time.sleep(interval)
+        except BaseException:
+            with self.lock:
+                self.reset()
+            raise
+
+
+feeds: dict[tuple, StatusFeed] = {}
+feeds_lock = threading.Lock()
+
+
+def status_feed(**filters) -> StatusFeed:
+    # supports author, num, status; one shared feed per filter set
+    key = tuple(sorted((k, str(v)) for k, v in filters.items()))
+    with feeds_lock:
+        feed = feeds.get(key)
+        if feed is None:
+            feed = feeds[key] = StatusFeed(**filters)
+    return feed
+
+
+def status_stream(callback=None, **filters) -> Subscription:
+    # supports author, num, status
+    # with a callback, events are delivered to it from the poller thread; otherwise iterate the subscription
+    feed = status_feed(**filters)
+    if callback is not None:
+        return feed.subscribe(CallbackSubscription(feed, callback))
+    return feed.subscribe(Subscription(feed))
+
+
+def status_stream_async(**filters) -> AsyncSubscription:
+    # supports author, num, status; call from a running event loop and consume with `async for`
+    feed = status_feed(**filters)
+    return feed.subscribe(AsyncSubscription(feed))
@@ -0,0 +1,218 @@
+import math
+import operator
+from array import array
+from collections.abc import Iterable
+from datetime import datetime
+
+from . import SubmitStatus, detect_lang
+
+np = ...  # numpy, None when it isn't installed; ... until load_numpy() first looks for it
+
+
+def load_numpy():
+    # optional, vectorizes where() and aggregation: pip install timus_api[numpy]
+    # imported on first use, so that `import timus_api` doesn't pay for it
+    global np
+    if np is ...:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+    return np
+
+
+# column layout: numbers live in typed arrays, strings are dictionary-encoded into int codes
+numeric = {'submit_id': 'q', 'timestamp': 'd', 'accepted': 'b', 'test': 'q', 'runtime': 'd', 'memory': 'q'}
+encoded = ('reason', 'author_id', 'author_name', 'task_id', 'task_name', 'lang_name', 'lang_code', 'stat')
+missing = {'q': -1, 'd': math.nan, 'b': -1}  # how None is stored in numeric columns
+
+
+class Dictionary:
+    # each distinct value is stored once, rows hold its code
+
+    def __init__(self, values=(), codes=()):
+        self.values = [*values]
+        self.index = {v: i for i, v in enumerate(self.values)}
+        self.codes = array('i', codes)
+
+    def code(self, value):
+        c = self.index.get(value)
+        if c is None:
+            c = self.index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def lookup(self, value):
+        # code of value, also matching ids given as int where the table holds str or vice versa
+        for v in (value, str(value), _int(value)):
+            if v in self.index:
+                return self.index[v]
+        return None
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _encode(name, value):
+    if name == 'accepted':
+        return -1 if value is None else int(value)
+    return missing[numeric[name]] if value is None else value
+
+
+def _decode(name, value):
+    if name == 'accepted':
+        return None if value < 0 else bool(value)
+    if value == missing[numeric[name]] or value != value:
+        return None
+    return value
+
+
+class StatusTable:
+    # compact columnar container of status rows, keeps insertion (newest first) order
+    # rows are materialized as SubmitStatus on access; where()/status_iter() filter whole columns at once
+
+    def __init__(self, rows: Iterable[SubmitStatus] = ()):
+        self.columns = {name: array(typecode) for name, typecode in numeric.items()}
+        self.columns.update({name: Dictionary() for name in encoded})
+        self.extend(rows)
+
+    def append(self, st: SubmitStatus):
+        for name, column in self.columns.items():
+            value = st[name]
+            column.append(_encode(name, value) if name in numeric else value)
+
+    def extend(self, rows: Iterable[SubmitStatus]):
+        for st in rows:
+            self.append(st)
+
+    def __len__(self):
+        return len(self.columns['submit_id'])
+
+    def row(self, i) -> SubmitStatus:
+        st = SubmitStatus()
+        for name, column in self.columns.items():
+            st[name] = _decode(name, column[i]) if name in numeric else column[i]
+        return st
+
+    def __iter__(self):
+        return map(self.row, range(len(self)))
+
+    def __getitem__(self, k):
+        if isinstance(k, str):
+            return self.column(k)
+        if isinstance(k, slice):
+            return self.take(range(len(self))[k])
+        return self.row(range(len(self))[k])
+
+    def column(self, name):
+        column = self.columns[name]
+        if name in numeric:
+            return [_decode(name, v) for v in column]
+        return [column.values[c] for c in column.codes]
+
+    def take(self, indices) -> 'StatusTable':
+        table = StatusTable()
+        for name, column in self.columns.items():
+            if name in numeric:
+                table.columns[name] = array(column.typecode, (column[i] for i in indices))
+            else:
+                table.columns[name] = Dictionary(column.values, (column.codes[i] for i in indices))
+        return table
+
+    def filter(self, mask) -> 'StatusTable':
+        return self.take([i for i, m in enumerate(mask) if m])
+
+    def _mask(self, name, op, value):
+        column = self.columns[name]
+        if name in encoded:
+            value = column.lookup(value)
+            if value is None:
+                return [False] * len(self)
+            column = column.codes
+        else:
+            value = _encode(name, value)
+        np = load_numpy()
+        if np is not None:
+            return op(np.frombuffer(column, dtype=column.typecode), value)
+        return [op(v, value) for v in column]
+
+    def mask(self, **kwargs):
+        # supports author, num, status, lang, from, from_, upto (same meaning as in status_cached_iter)
+        # returns one boolean per row, a numpy array when numpy is installed
+        masks = []
+        if 'author' in kwargs:
+            masks.append(self._mask('author_id', operator.eq, kwargs['author']))
+        if 'num' in kwargs:
+            masks.append(self._mask('task_id', operator.eq, kwargs['num']))
+        if 'status' in kwargs:
+            masks.append(self._mask('accepted', operator.eq, kwargs['status'] == 'accepted'))
+        if 'lang' in kwargs:
+            masks.append(self._mask('lang_code', operator.eq, detect_lang(kwargs['lang'])))
+        if 'from_' in kwargs:
+            kwargs['from'] = kwargs.pop('from_')
+        for key, op in (('from', operator.le), ('upto', operator.gt)):
+            if key not in kwargs:
+                continue
+            value = kwargs[key]
+            if isinstance(value, int):
+                masks.append(self._mask('submit_id', op, value))
+            else:
+                if isinstance(value, datetime):
+                    value = value.timestamp()
+                masks.append(self._mask('timestamp', op, value))
+        np = load_numpy()
+        if not masks:
+            return np.ones(len(self), dtype=bool) if np is not None else [True] * len(self)
+        if np is not None:
+            return np.logical_and.reduce(masks)
+        return [all(m) for m in zip(*masks)]
+
+    def where(self, **kwargs) -> 'StatusTable':
+        return self.filter(self.mask(**kwargs))
+
+    def status_iter(self, **kwargs):
+        # supports author, num, status, lang, count, from, from_, upto
+        count = kwargs.pop('count', math.inf)
+        for n, i in enumerate(i for i, m in enumerate(self.mask(**kwargs)) if m):
+            if n >= count:
+                break
+            yield self.row(i)
+
+    def to_numpy(self):
+        # {column: ndarray}, string columns are decoded into object arrays
+        import numpy
+        rsp = {}
+        for name, column in self.columns.items():
+            if name in numeric:
+                rsp[name] = numpy.frombuffer(column, dtype=column.typecode).copy()
+            else:
+                rsp[name] = numpy.array(column.values, dtype=object)[numpy.frombuffer(column.codes, dtype='i')]
+        return rsp
+
+    def to_arrow(self):
+        # pyarrow.Table, string columns become dictionary arrays sharing the encoded values
+        # requires pyarrow: pip install timus_api[arrow]
+        import pyarrow
+        arrays = {}
+        types = {'q': pyarrow.int64(), 'd': pyarrow.float64(), 'b': pyarrow.bool_()}
+        for name, column in self.columns.items():
+            if name in numeric:
+                arrays[name] = pyarrow.array(self.column(name), types[column.typecode])
+            else:
+                codes = pyarrow.Array.from_buffers(pyarrow.int32(), len(column), [None, pyarrow.py_buffer(column.codes)])
+                values = pyarrow.array([None if v is None else str(v) for v in column.values], pyarrow.string())
+                arrays[name] = pyarrow.DictionaryArray.from_arrays(codes, values)
+        return pyarrow.table(arrays)
@@ -0,0 +1,76 @@
+import bisect
+import json
+import os
+import threading
+
+from .langs import cache_path
+
+
+class TimeIndex:
+    # sparse (submit_id, timestamp) samples collected from every fetched status page
+    # submit ids grow roughly in step with time, so interpolating between two samples
+    # lands close to the submit_id of any timestamp; status_find uses it to seed its probes.
+    # samples closer than `resolution` submit ids to an existing one are dropped
+
+    def __init__(self, path=None, resolution=1000):
+        self.path = path
+        self.resolution = resolution
+        self.ids: list[int] = []
+        self.stamps: list[float] = []
+        self.dirty = False
+        self.lock = threading.Lock()
+        if path is not None and os.path.isfile(path):
+            try:
+                with open(path, "rt", encoding="utf-8") as f:
+                    samples = json.load(f)
+            except (OSError, ValueError):
+                samples = []  # unreadable copy: start over, the next save replaces it
+            for submit_id, timestamp in samples:
+                self.insert(submit_id, timestamp)
+            self.dirty = False
+
+    def insert(self, submit_id, timestamp):
+        with self.lock:
+            i = bisect.bisect_left(self.ids, submit_id)
+            for j in (i - 1, i):
+                if 0 <= j < len(self.ids) and abs(self.ids[j] - submit_id) < self.resolution:
+                    return
+            self.ids.insert(i, submit_id)
+            self.stamps.insert(i, timestamp)
+            self.dirty = True
+
+    def add(self, rows):
+        # first and last row of a page are enough, the rows in between are consecutive
+        if rows:
+            for st in (rows[0], rows[-1]):
+                self.insert(st.submit_id, st.timestamp)
+
+    def bracket(self, timestamp):
+        # samples (submit_id, timestamp) right below and above timestamp, None where there is none
+        with self.lock:
+            i = bisect.bisect_right(self.stamps, timestamp)
+            lo = (self.ids[i - 1], self.stamps[i - 1]) if i > 0 else None
+            hi = (self.ids[i], self.stamps[i]) if i < len(self.ids) else None
+        return lo, hi
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        with self.lock:
+            samples = [*zip(self.ids, self.stamps)]
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "wt", encoding="utf-8") as f:
+                    json.dump(samples, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                return  # a read-only cache dir only costs the samples of this run, stays dirty for a retry
+            self.dirty = False
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def default_path():
+    return cache_path("timeindex.json")
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import Future, as_completed
+
+from . import SubmitStatus, status_iter
+
+
+def _deliver(callback):
+    def done(future: Future):
+        if not future.cancelled() and future.exception() is None:
+            callback(future.result())
+    return done
+
+
+class VerdictWatcher:
+    # resolves verdicts of many pending submissions with one status request per poll:
+    # each poll fetches the submit_id range spanning all pending ids (usually a single page)
+    # and resolves every pending id found there with a final verdict.
+    # polling starts at `interval` seconds and slows down by `backoff` up to `max_interval`
+    # while nothing gets resolved; accepts author, num to narrow the status query.
+    # after `max_failures` polls in a row fail (each already retried by the client), every pending
+    # verdict fails with the last error instead of waiting for a judge that can't be reached
+
+    def __init__(self, interval=1.0, max_interval=10.0, backoff=1.5, delay=2.0, callback=None, max_failures=3,
+                 **kwargs):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.delay = delay
+        self.max_failures = max_failures
+        self.callback = callback
+        self.kwargs = kwargs
+        self.pending: dict[int, Future] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.thread = None
+        self.reset = False
+
+    def add(self, submit_id, callback=None) -> Future:
+        submit_id = int(submit_id)
+        with self.lock:
+            future = self.pending.get(submit_id)
+            if future is None:
+                future = self.pending[submit_id] = Future()
+                if self.callback is not None:
+                    future.add_done_callback(_deliver(self.callback))
+            if callback is not None:
+                future.add_done_callback(_deliver(callback))
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="timus-verdict-watcher", daemon=True)
+                self.thread.start()
+            self.reset = True  # fresh submission, poll at the base rate again
+        return future
+
+    def wait(self, submit_id, timeout=None) -> SubmitStatus:
+        return self.add(submit_id).result(timeout)
+
+    def poll(self):
+        # one status request (or more if the pending ids span more than a page); returns resolved count
+        with self.lock:
+            ids = [*self.pending]
+        if not ids:
+            return 0
+        resolved = 0
+        self.requests += 1
+        for st in status_iter(from_=max(ids), upto=min(ids) - 1, **self.kwargs):
+            if st.accepted is None:
+                continue
+            with self.lock:
+                future = self.pending.pop(st.submit_id, None)
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(st)
+                resolved += 1
+        return resolved
+
+    def run(self):
+        interval = self.interval
+        failures = 0
+        time.sleep(self.delay)
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+            try:
+                resolved = self.poll()
+                failures = 0
+            except Exception as e:
+                resolved = 0
+                failures += 1
+                if failures >= self.max_failures:
+                    self.fail(e)
+                    failures = 0
+                    continue
+            interval = self.interval if resolved else min(interval * self.backoff, self.max_interval)
+            if self.reset:
+                interval, self.reset = self.interval, False
+            time.sleep(interval)
+
+    def fail(self, error):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def cancel(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.cancel()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def __iter__(self):
+        # yields verdicts of the currently pending submissions as they finish
+        with self.lock:
+            futures = [*self.pending.values()]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+watcher = VerdictWatcher()  # shared by submit_sync